@@ -6,6 +6,7 @@ export interface Vendor {
     name: string;
     company: string;
     category: VendorCategory;
+    category_mask?: number; // every category the sources list, one bit each (order in scripts/vendor_categories.py)
     gdpr_compliant: boolean;
     dpa_url?: string;
     privacy_policy?: string;
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Set-backed domain accumulator shared by the importers and the merge.
+
+Merging a copy costs O(its domains) instead of re-sorting the whole list
+every time (`sorted(list(set(a) | set(b)))`); the sorted list is built once,
+when the vendor is finalized.
+
+Run directly to benchmark both approaches on a synthetic vendor.
+"""
+
+import random
+import time
+from typing import Iterable, Iterator, List, Set
+
+
+class DomainSet:
+    """A vendor's domains while it is being merged."""
+
+    __slots__ = ('domains', 'changed')
+
+    def __init__(self, domains: Iterable[str] = ()):
+        self.domains = set(domains)
+        # Set once anything was merged in, i.e. the final list must be rebuilt
+        self.changed = False
+
+    def update(self, domains: Iterable[str]) -> Set[str]:
+        """Merge in `domains`, returning the ones that were new."""
+        new = set(domains)
+        new -= self.domains
+        if new:
+            self.domains |= new
+            self.changed = True
+        return new
+
+    def __contains__(self, domain: str) -> bool:
+        return domain in self.domains
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.domains)
+
+    def __len__(self) -> int:
+        return len(self.domains)
+
+    def sorted(self) -> List[str]:
+        return sorted(self.domains)
+
+
+def benchmark(subdomains: int = 10000, copies: int = 100, repeat: int = 3):
+    """
+    One vendor with `subdomains` subdomains spread over `copies` country
+    copies (each sees a random 10-100% of them), merged copy by copy.
+    """
+    rng = random.Random(0)
+    universe = [f"s{i}.tracker.example" for i in range(subdomains)]
+    country_copies = [rng.sample(universe, rng.randint(subdomains // 10, subdomains)) for _ in range(copies)]
+
+    def resort_every_merge():
+        domains = sorted(list(set(country_copies[0])))
+        for copy in country_copies[1:]:
+            domains = sorted(list(set(domains) | set(copy)))
+        return domains
+
+    def accumulate():
+        domains = DomainSet(country_copies[0])
+        for copy in country_copies[1:]:
+            domains.update(copy)
+        return domains.sorted()
+
+    print(f"⏱️  Merging {copies} copies of a vendor with {subdomains} subdomains (best of {repeat})")
+    timings = {}
+    for name, merge in (('sorted(set | set) per merge', resort_every_merge), ('DomainSet, sort once', accumulate)):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = merge()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = (best, result)
+        print(f"   {name:<28} {best * 1000:8.1f} ms")
+
+    (slow, expected), (fast, actual) = timings.values()
+    print(f"   {slow / fast:.1f}x faster, identical output: {actual == expected}")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -1,13 +1,28 @@
 #!/usr/bin/env python3
 """
 Import Disconnect Tracking Protection into ETALON.
-Parses services.json and outputs vendors-disconnect.json.
+Parses services.json and outputs vendors-disconnect.json (or .jsonl), and
+entities.json into a same-owner index (owner-index-disconnect.bin).
 """
 
+import argparse
+import bisect
 import json
 import re
+import struct
+import sys
+from array import array
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import ijson  # Optional: incremental parsing of large lists
+except ImportError:
+    ijson = None
+
+from domain_set import DomainSet
+from vendor_categories import CATEGORY_BITS
+from vendor_jsonl import VendorArrayWriter, VendorWriter, jsonl_path
 
 # Map Disconnect categories → ETALON VendorCategory
 CATEGORY_MAP = {
@@ -45,103 +60,343 @@ def sanitize_id(name: str) -> str:
     return re.sub(r'[^a-z0-9-]', '-', name.lower()).strip('-')
 
 
-def parse_disconnect_services():
-    """Parse Disconnect services.json."""
-    services_path = Path(__file__).parent.parent / 'data' / 'imports' / 'disconnect' / 'services.json'
+def _build_value(events: Iterator[Tuple[str, object]]):
+    """Assemble the next complete JSON value from a stream of ijson events."""
+    builder = ijson.ObjectBuilder()
+    nesting = 0
+    for event, value in events:
+        builder.event(event, value)
+        if event in ('start_map', 'start_array'):
+            nesting += 1
+        elif event in ('end_map', 'end_array'):
+            nesting -= 1
+        if nesting == 0:
+            return builder.value
+
+
+def iter_company_entries(services_path: Path) -> Iterator[Tuple[str, str, Dict]]:
+    """
+    Yield (category, company name, company data) for every company entry
+    in services.json ({"categories": {category: [{company: {url: [domains]}}]}}).
+    With ijson installed the file is parsed incrementally, so memory is
+    bounded by the largest company entry; otherwise it is loaded whole.
+    """
+    if ijson is None:
+        with open(services_path) as f:
+            data = json.load(f)
+        for category_name, entries in data.get('categories', {}).items():
+            for entry in entries:
+                for company_name, company_data in entry.items():
+                    yield category_name, company_name, company_data
+        return
+
+    with open(services_path, 'rb') as f:
+        events = ijson.basic_parse(f, use_float=True)
+        depth = 0
+        in_categories = False
+        category_name = None
+        for event, value in events:
+            if event == 'map_key':
+                if depth == 1:
+                    in_categories = value == 'categories'
+                elif depth == 2 and in_categories:
+                    category_name = value
+                elif depth == 4 and in_categories:
+                    # Build just this company's entry, then drop it
+                    yield category_name, value, _build_value(events)
+            elif event in ('start_map', 'start_array'):
+                depth += 1
+            elif event in ('end_map', 'end_array'):
+                depth -= 1
+
+
+def entry_domains(company_data: Dict) -> Tuple[List[str], str]:
+    """The domains and website of one company entry."""
+    domains = []
+    website = ''
+    for url_or_key, value in company_data.items():
+        if url_or_key.startswith('http'):
+            website = url_or_key
+        if isinstance(value, list):
+            for d in value:
+                if isinstance(d, str) and '.' in d and len(d) > 3:
+                    domains.append(d.lower())
+        elif isinstance(value, str) and value in ('performance',):
+            # Some entries have string flags, skip
+            pass
+    return domains, website
+
+
+def iter_disconnect_vendors(services_path: Optional[Path] = None) -> Iterator[Dict]:
+    """
+    Stream the vendors of Disconnect services.json (or a community-extended
+    list in the same format). A company listed in several categories is
+    merged into one vendor, yielded after its last entry; the others are
+    yielded as soon as their entry is read. A first pass counts each
+    company's entries, so only vendors waiting for a later entry are held.
+    """
+    services_path = services_path or Path(__file__).parent.parent / 'data' / 'imports' / 'disconnect' / 'services.json'
 
     if not services_path.exists():
         print(f"❌ Disconnect data not found at {services_path}")
-        return []
-
-    with open(services_path) as f:
-        data = json.load(f)
-
-    print(f"📖 Reading Disconnect services.json")
-
-    vendors = {}
-
-    for category_name, entries in data.get('categories', {}).items():
-        etalon_category = CATEGORY_MAP.get(category_name, 'other')
-        risk_score = RISK_BY_CATEGORY.get(category_name, 5)
-
-        for entry in entries:
-            for company_name, company_data in entry.items():
-                vendor_id = sanitize_id(company_name)
-                if not vendor_id or len(vendor_id) < 2:
-                    continue
-
-                # Collect domains from the entry
-                domains = []
-                website = ''
-                for url_or_key, value in company_data.items():
-                    if url_or_key.startswith('http'):
-                        website = url_or_key
-                    if isinstance(value, list):
-                        for d in value:
-                            if isinstance(d, str) and '.' in d and len(d) > 3:
-                                domains.append(d.lower())
-                    elif isinstance(value, str) and value in ('performance',):
-                        # Some entries have string flags, skip
-                        pass
-
-                if not domains:
-                    continue
-
-                domains = sorted(list(set(domains)))
-
-                if vendor_id not in vendors:
-                    vendors[vendor_id] = {
-                        'id': vendor_id,
-                        'domains': domains,
-                        'name': company_name,
-                        'company': company_name,
-                        'category': etalon_category,
-                        'gdpr_compliant': False,
-                        'risk_score': risk_score,
-                        'tier': 'standard',
-                        'source': 'disconnect',
-                        'disconnect_category': category_name,
-                    }
-                    if website:
-                        vendors[vendor_id]['website'] = website
-                else:
-                    # Merge domains
-                    existing = vendors[vendor_id]
-                    all_domains = set(existing['domains']) | set(domains)
-                    existing['domains'] = sorted(list(all_domains))
-
-    result = list(vendors.values())
-
-    # Stats
+        return
+
+    print(f"📖 Reading Disconnect {services_path.name}" + (" (streaming)" if ijson is not None else ""))
+
+    remaining = {}  # Vendor id → entries still to come
+    for _, company_name, _ in iter_company_entries(services_path):
+        vendor_id = sanitize_id(company_name)
+        remaining[vendor_id] = remaining.get(vendor_id, 0) + 1
+
+    pending = {}
     categories = {}
-    for v in result:
-        cat = v['category']
-        categories[cat] = categories.get(cat, 0) + 1
+    count = total_domains = 0
+    for category_name, company_name, company_data in iter_company_entries(services_path):
+        vendor_id = sanitize_id(company_name)
+        if not vendor_id or len(vendor_id) < 2:
+            continue
+        remaining[vendor_id] -= 1
+
+        domains, website = entry_domains(company_data)
+        if domains:
+            etalon_category = CATEGORY_MAP.get(category_name, 'other')
+            if vendor_id not in pending:
+                pending[vendor_id] = {
+                    'id': vendor_id,
+                    'domains': DomainSet(domains),
+                    'name': company_name,
+                    'company': company_name,
+                    'category': etalon_category,
+                    'category_mask': CATEGORY_BITS[etalon_category],
+                    'gdpr_compliant': False,
+                    'risk_score': RISK_BY_CATEGORY.get(category_name, 5),
+                    'tier': 'standard',
+                    'source': 'disconnect',
+                    'disconnect_category': category_name,
+                }
+                if website:
+                    pending[vendor_id]['website'] = website
+            else:
+                # Merge domains; the first category stays primary, all are kept in the mask
+                pending[vendor_id]['domains'].update(domains)
+                pending[vendor_id]['category_mask'] |= CATEGORY_BITS[etalon_category]
 
-    total_domains = sum(len(v['domains']) for v in result)
-    print(f"\n✅ Imported {len(result)} vendors from Disconnect")
+        if remaining[vendor_id] == 0 and vendor_id in pending:
+            vendor = pending.pop(vendor_id)
+            vendor['domains'] = vendor['domains'].sorted()
+            count += 1
+            total_domains += len(vendor['domains'])
+            categories[vendor['category']] = categories.get(vendor['category'], 0) + 1
+            yield vendor
+
+    print(f"\n✅ Imported {count} vendors from Disconnect")
     print(f"   Total domains: {total_domains}")
     print(f"\n   By category:")
-    for cat, count in sorted(categories.items(), key=lambda x: -x[1]):
-        print(f"     {cat}: {count}")
+    for cat, n in sorted(categories.items(), key=lambda x: -x[1]):
+        print(f"     {cat}: {n}")
+
+
+def parse_disconnect_services(services_path: Optional[Path] = None) -> List[Dict]:
+    """All vendors of Disconnect services.json as a list (see iter_disconnect_vendors())."""
+    return list(iter_disconnect_vendors(services_path))
+
+
+OWNER_INDEX_MAGIC = b'ETOI'
+OWNER_INDEX_VERSION = 1
+OWNER_INDEX_HEADER = struct.Struct('<4sHBxIIII')
+
 
-    return result
+def iter_entities(entities_path: Path) -> Iterator[Tuple[str, Dict]]:
+    """Yield (entity name, {'properties': [...], 'resources': [...]}) from entities.json."""
+    if ijson is None:
+        with open(entities_path) as f:
+            yield from json.load(f).get('entities', {}).items()
+        return
+    with open(entities_path, 'rb') as f:
+        yield from ijson.kvitems(f, 'entities', use_float=True)
+
+
+class OwnerIndex:
+    """
+    Domain → owner lookup built from Disconnect entities.json. The file holds
+    (all integers little-endian):
+      header     magic 'ETOI', u16 version, u8 id bits, pad, u32 domains,
+                 u32 owners, u32 domain bytes, u32 owner bytes
+      offsets    (domains + 1) × u32 start of each domain in the domain blob
+      domains    sorted domains, concatenated UTF-8 (binary searched)
+      owner ids  domains × id bits, bit-packed LSB first
+      owners     owner names, '\n'-joined (line number = owner id)
+    """
+
+    def __init__(self, domains: List[str], owner_ids: Sequence[int], owners: List[str]):
+        self.domains = domains
+        self.owner_ids = owner_ids
+        self.owners = owners
+
+    @classmethod
+    def from_entities(cls, entities_path: Path) -> 'OwnerIndex':
+        """Index every property and resource domain; a domain listed by several entities keeps the first."""
+        claims = {}
+        names = []
+        conflicts = 0
+        for name, entity in iter_entities(entities_path):
+            owner_id = len(names)
+            names.append(name)
+            for key in ('properties', 'resources'):
+                for domain in entity.get(key) or []:
+                    if not isinstance(domain, str) or '.' not in domain:
+                        continue
+                    domain = domain.strip().lower()
+                    claimed = claims.setdefault(domain, owner_id)
+                    conflicts += claimed != owner_id
+        if conflicts:
+            print(f"   ⚠️  {conflicts} domains listed by more than one entity (kept the first)")
+        domains = sorted(claims)
+        return cls(domains, [claims[d] for d in domains], names)
+
+    def owner_id(self, host: str) -> Optional[int]:
+        """Owner of `host` or of its closest listed parent domain."""
+        host = host.strip().lower().rstrip('.')
+        while '.' in host:
+            i = bisect.bisect_left(self.domains, host)
+            if i < len(self.domains) and self.domains[i] == host:
+                return self.owner_ids[i]
+            host = host.split('.', 1)[1]
+        return None
+
+    def owner(self, host: str) -> Optional[str]:
+        owner_id = self.owner_id(host)
+        return None if owner_id is None else self.owners[owner_id]
+
+    def same_owner(self, a: str, b: str) -> bool:
+        """Whether both hosts belong to the same (known) entity."""
+        owner_a = self.owner_id(a)
+        return owner_a is not None and owner_a == self.owner_id(b)
+
+    def save(self, path: Path):
+        bits = max(1, (len(self.owners) - 1).bit_length())
+        blob = ''.join(self.domains).encode()
+        offsets = array('I', [0])
+        for domain in self.domains:
+            offsets.append(offsets[-1] + len(domain.encode()))
+
+        # Pack the ids LSB first, flushing whole bytes as they fill
+        packed = bytearray()
+        acc = filled = 0
+        for owner_id in self.owner_ids:
+            acc |= owner_id << filled
+            filled += bits
+            while filled >= 8:
+                packed.append(acc & 0xFF)
+                acc >>= 8
+                filled -= 8
+        if filled:
+            packed.append(acc)
+
+        owners = '\n'.join(self.owners).encode()
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        with open(path, 'wb') as f:
+            f.write(OWNER_INDEX_HEADER.pack(OWNER_INDEX_MAGIC, OWNER_INDEX_VERSION, bits, len(self.domains),
+                                            len(self.owners), len(blob), len(owners)))
+            f.write(offsets.tobytes())
+            f.write(blob)
+            f.write(packed)
+            f.write(owners)
+
+    @classmethod
+    def load(cls, path: Path) -> 'OwnerIndex':
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, bits, count, owner_count, blob_bytes, owner_bytes = OWNER_INDEX_HEADER.unpack_from(data)
+        if magic != OWNER_INDEX_MAGIC or version != OWNER_INDEX_VERSION:
+            raise ValueError(f"{path} is not a version {OWNER_INDEX_VERSION} owner index")
+        pos = OWNER_INDEX_HEADER.size
+        offsets = array('I')
+        offsets.frombytes(data[pos:pos + (count + 1) * 4])
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        pos += (count + 1) * 4
+        blob = data[pos:pos + blob_bytes]
+        domains = [blob[offsets[i]:offsets[i + 1]].decode() for i in range(count)]
+        pos += blob_bytes
+
+        packed_bytes = (count * bits + 7) // 8
+        owner_ids = array('I')
+        mask = (1 << bits) - 1
+        acc = filled = 0
+        for byte in data[pos:pos + packed_bytes]:
+            acc |= byte << filled
+            filled += 8
+            while filled >= bits and len(owner_ids) < count:
+                owner_ids.append(acc & mask)
+                acc >>= bits
+                filled -= bits
+        pos += packed_bytes
+        owners = data[pos:pos + owner_bytes].decode().split('\n') if owner_count else []
+        return cls(domains, owner_ids, owners)
+
+
+def owner_index_path() -> Path:
+    return Path(__file__).parent.parent / 'data' / 'owner-index-disconnect.bin'
+
+
+def build_owner_index(entities_path: Optional[Path] = None) -> Optional[OwnerIndex]:
+    """Build and save the same-owner index from entities.json, if present."""
+    entities_path = entities_path or Path(__file__).parent.parent / 'data' / 'imports' / 'disconnect' / 'entities.json'
+    if not entities_path.exists():
+        print(f"\n   No entities.json at {entities_path}, skipping the owner index")
+        return None
+
+    print(f"\n📖 Reading Disconnect {entities_path.name}")
+    index = OwnerIndex.from_entities(entities_path)
+    output_path = owner_index_path()
+    index.save(output_path)
+    print(f"💾 Saved owner index to: {output_path}")
+    print(f"   {len(index.domains)} domains, {len(index.owners)} owners, "
+          f"{output_path.stat().st_size / 1024:.0f} KB")
+    return index
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Import Disconnect Tracking Protection into ETALON.')
+    parser.add_argument('--source', type=Path,
+                        help='services.json to import, e.g. a community-extended list '
+                             '(default: data/imports/disconnect/services.json)')
+    parser.add_argument('--entities', type=Path,
+                        help='entities.json for the owner index (default: data/imports/disconnect/entities.json)')
+    parser.add_argument('--jsonl', action='store_true',
+                        help='write vendors-disconnect.jsonl (one vendor per line) instead of vendors-disconnect.json')
+    parser.add_argument('--same-owner', nargs=2, metavar=('HOST', 'HOST'),
+                        help='look up both hosts in the saved owner index and exit')
+    args = parser.parse_args()
+
     print("🔌 Disconnect Tracking Protection Import")
     print("=" * 60)
 
-    vendors = parse_disconnect_services()
+    if args.same_owner:
+        if not owner_index_path().exists():
+            print(f"❌ No owner index at {owner_index_path()}, run the import first")
+            return
+        index = OwnerIndex.load(owner_index_path())
+        for host in args.same_owner:
+            print(f"   {host}: {index.owner(host) or 'unknown owner'}")
+        print(f"   Same owner: {'yes' if index.same_owner(*args.same_owner) else 'no'}")
+        return
+
+    # Each vendor is written as soon as it is complete
+    output_path = Path(__file__).parent.parent / 'data' / 'vendors-disconnect.json'
+    writer = VendorWriter(jsonl_path(output_path)) if args.jsonl else VendorArrayWriter(output_path)
+    writer.extend(iter_disconnect_vendors(args.source))
 
-    if vendors:
-        output_path = Path(__file__).parent.parent / 'data' / 'vendors-disconnect.json'
-        with open(output_path, 'w') as f:
-            json.dump(vendors, f, indent=2)
-        print(f"\n💾 Saved to: {output_path}")
-        print(f"   {len(vendors)} vendors ready to merge")
+    if writer.count:
+        writer.close()
+        print(f"\n💾 Saved to: {writer.path}")
+        print(f"   {writer.count} vendors ready to merge")
+        build_owner_index(args.entities)
         print("\n✅ Import complete!")
     else:
+        writer.discard()
         print("\n❌ No vendors imported")
 
 
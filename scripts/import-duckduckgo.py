@@ -5,11 +5,63 @@ Processes domain JSON files from all country folders,
 deduplicates by domain, and produces vendors-duckduckgo.json.
 """
 
+import argparse
+import bisect
+import calendar
+import hashlib
+import heapq
 import json
 import os
+import queue
 import re
-from pathlib import Path
-from typing import Dict, List, Optional
+import struct
+import subprocess
+import sys
+import tarfile
+import threading
+import time
+import zipfile
+from array import array
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import groupby, islice
+from pathlib import Path, PurePath, PurePosixPath
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+try:
+    import msgspec  # Optional: fast selective decoding
+except ImportError:
+    msgspec = None
+
+try:
+    import numpy as np  # Optional: vectorized batch risk scoring
+except ImportError:
+    np = None
+
+from domain_set import DomainSet
+from sqlite_store import RssCapExceeded, SqliteStore, report_peak_rss
+from tracker_artifacts import build_cname_index, build_initiator_graph, build_resource_matcher
+from vendor_categories import category_mask
+from vendor_jsonl import VendorArrayWriter, VendorWriter, iter_jsonl, jsonl_path, newest_vendor_file
+
+# Bump whenever parse_duckduckgo_domain() output changes, so cached
+# records in the incremental import manifest are discarded.
+MANIFEST_VERSION = 6
+
+# Files handed to a pool worker at once, and how many entries the
+# reader thread may decompress/stat ahead of the parser
+PARSE_BATCH_SIZE = 256
+PREFETCH_DEPTH = 1024
+
+# Default number of processed files between import checkpoints
+CHECKPOINT_EVERY = 5000
+
+# Vendors risk-scored (and handed to the output writer) at a time
+SCORE_BATCH = 1000
 
 # Map DuckDuckGo categories → ETALON VendorCategory
 CATEGORY_MAP = {
@@ -44,18 +96,30 @@ CATEGORY_MAP = {
     'Pornvertising': 'advertising',
 }
 
+# Risk score weights, shared by the scalar and batch scorers.
+# Bonus tiers are (threshold, bonus); the first threshold exceeded wins.
+BASE_RISK_SCORE = 5.0
+PREVALENCE_BONUSES = [(0.4, 2), (0.2, 1), (0.1, 0.5)]
+COOKIE_BONUSES = [(0.8, 1), (0.5, 0.5)]
+HIGH_RISK_CATEGORIES = ['Advertising', 'Ad Motivated Tracking', 'Ad Fraud',
+                        'Session Replay', 'Fingerprinting']
+HIGH_RISK_BONUS = 1
+
+
+def _tier_bonus(value: float, tiers: List[Tuple[float, float]]) -> float:
+    for threshold, bonus in tiers:
+        if value > threshold:
+            return bonus
+    return 0
+
+
 def calculate_risk_score(tracker: Dict) -> int:
     """Auto-calculate risk score from DuckDuckGo data."""
-    score = 5.0  # Base score
+    score = BASE_RISK_SCORE
 
     # Prevalence (0-1, higher = on more sites = more data collection power)
     prevalence = tracker.get('prevalence', 0)
-    if prevalence > 0.4:
-        score += 2
-    elif prevalence > 0.2:
-        score += 1
-    elif prevalence > 0.1:
-        score += 0.5
+    score += _tier_bonus(prevalence, PREVALENCE_BONUSES)
 
     # Fingerprinting (0-3 scale from DuckDuckGo)
     fingerprinting = tracker.get('fingerprinting', 0)
@@ -63,21 +127,66 @@ def calculate_risk_score(tracker: Dict) -> int:
 
     # Cookies (aggregate from resources)
     cookies = tracker.get('cookies', 0)
-    if cookies > 0.8:
-        score += 1
-    elif cookies > 0.5:
-        score += 0.5
+    score += _tier_bonus(cookies, COOKIE_BONUSES)
 
     # High-risk categories
     categories = tracker.get('categories', [])
-    high_risk_cats = ['Advertising', 'Ad Motivated Tracking', 'Ad Fraud',
-                      'Session Replay', 'Fingerprinting']
-    if any(cat in high_risk_cats for cat in categories):
-        score += 1
+    if any(cat in HIGH_RISK_CATEGORIES for cat in categories):
+        score += HIGH_RISK_BONUS
 
     return min(int(round(score)), 10)
 
 
+def calculate_risk_scores(prevalence, fingerprinting, cookies, high_risk) -> List[int]:
+    """
+    Batch version of calculate_risk_score() over columns of prevalence,
+    fingerprinting, cookies and high-risk-category flags. Uses NumPy when
+    installed (same float operations in the same order, so results match
+    the scalar function exactly), otherwise loops over the scalar function.
+    """
+    if np is None:
+        return [
+            calculate_risk_score({'prevalence': p, 'fingerprinting': f, 'cookies': c,
+                                  'categories': HIGH_RISK_CATEGORIES[:1] if h else []})
+            for p, f, c, h in zip(prevalence, fingerprinting, cookies, high_risk)
+        ]
+
+    def tier_bonus(values, tiers):
+        return np.select([values > threshold for threshold, _ in tiers],
+                         [bonus for _, bonus in tiers], 0)
+
+    prevalence = np.asarray(prevalence, dtype=np.float64)
+    score = np.full(prevalence.shape, BASE_RISK_SCORE)
+    score += tier_bonus(prevalence, PREVALENCE_BONUSES)
+    score += np.asarray(fingerprinting, dtype=np.float64)
+    score += tier_bonus(np.asarray(cookies, dtype=np.float64), COOKIE_BONUSES)
+    score += np.where(np.asarray(high_risk, dtype=bool), HIGH_RISK_BONUS, 0)
+    # np.round rounds half to even, like round()
+    return np.minimum(np.round(score), 10).astype(np.int64).tolist()
+
+
+def score_vendors(vendors: List[Dict], fields: Callable[[Dict], Dict] = lambda v: v) -> int:
+    """
+    Recompute risk_score for DuckDuckGo vendors in one batch. `fields` maps a
+    vendor to the dict holding its import fields (the vendor itself, or its
+    _import_metadata in a merged vendors.json). Vendors without the raw
+    `ddg_categories` are left alone. Returns how many scores changed.
+    """
+    scored = [v for v in vendors if 'ddg_categories' in fields(v)]
+    scores = calculate_risk_scores(
+        [fields(v).get('prevalence', 0) for v in scored],
+        [fields(v).get('fingerprinting', 0) for v in scored],
+        [fields(v).get('cookies', 0) for v in scored],
+        [any(cat in HIGH_RISK_CATEGORIES for cat in fields(v)['ddg_categories']) for v in scored],
+    )
+    changed = 0
+    for vendor, score in zip(scored, scores):
+        if vendor['risk_score'] != score:
+            vendor['risk_score'] = score
+            changed += 1
+    return changed
+
+
 def map_category(categories: List[str]) -> str:
     """Map DuckDuckGo categories to ETALON VendorCategory."""
     for cat in categories:
@@ -86,55 +195,202 @@ def map_category(categories: List[str]) -> str:
     return 'other'
 
 
+def map_category_mask(categories: List[str]) -> int:
+    """Bitmask of every ETALON category the DuckDuckGo categories map to."""
+    return category_mask([map_category(categories)] + [CATEGORY_MAP[c] for c in categories if c in CATEGORY_MAP])
+
+
 def sanitize_id(domain: str) -> str:
     """Create a vendor ID from a domain name."""
     # Remove TLD-like suffixes and sanitize
     return re.sub(r'[^a-z0-9-]', '-', domain.lower()).strip('-')
 
 
+@dataclass
+class TrackerRadarOwner:
+    """Owner fields of a Tracker Radar domain file."""
+    name: str = 'Unknown'
+    displayName: Optional[str] = None
+    privacyPolicy: str = ''
+
+
+@dataclass
+class TrackerRadarResource:
+    """Resource fields of a Tracker Radar domain file (exampleSites, apis etc. are skipped)."""
+    rule: str = ''
+    type: Optional[str] = None
+    cookies: Union[int, float] = 0
+    fingerprinting: Union[int, float] = 0
+    prevalence: Union[int, float] = 0
+    sites: int = 0
+
+
+@dataclass
+class TrackerRadarCname:
+    """A first-party alias CNAMEd onto the tracker (original → resolved)."""
+    original: str = ''
+    resolved: str = ''
+
+
+@dataclass
+class TrackerRadarInitiator:
+    """A domain seen loading the tracker (topInitiators entry)."""
+    domain: str = ''
+
+
+@dataclass
+class TrackerRadarDomain:
+    """The subset of a Tracker Radar domain file that the importer reads."""
+    domain: Optional[str] = None
+    owner: TrackerRadarOwner = field(default_factory=TrackerRadarOwner)
+    categories: List[str] = field(default_factory=list)
+    subdomains: List[str] = field(default_factory=list)
+    prevalence: Union[int, float] = 0
+    fingerprinting: Union[int, float] = 0
+    sites: int = 0
+    resources: List[TrackerRadarResource] = field(default_factory=list)
+    cnames: List[TrackerRadarCname] = field(default_factory=list)
+    topInitiators: List[TrackerRadarInitiator] = field(default_factory=list)
+
+
+def decode_stdlib(raw: bytes) -> TrackerRadarDomain:
+    """Decode with the stdlib json module, then project onto the typed structs."""
+    data = json.loads(raw)
+    owner = data.get('owner', {})
+    return TrackerRadarDomain(
+        domain=data.get('domain'),
+        owner=TrackerRadarOwner(
+            name=owner.get('name', 'Unknown'),
+            displayName=owner.get('displayName'),
+            privacyPolicy=owner.get('privacyPolicy', ''),
+        ),
+        categories=data.get('categories', []),
+        subdomains=data.get('subdomains', []),
+        prevalence=data.get('prevalence', 0),
+        fingerprinting=data.get('fingerprinting', 0),
+        sites=data.get('sites', 0),
+        resources=[
+            TrackerRadarResource(
+                rule=r.get('rule', ''),
+                type=r.get('type'),
+                cookies=r.get('cookies', 0),
+                fingerprinting=r.get('fingerprinting', 0),
+                prevalence=r.get('prevalence', 0),
+                sites=r.get('sites', 0),
+            )
+            for r in data.get('resources', [])
+        ],
+        cnames=[TrackerRadarCname(original=c.get('original', ''), resolved=c.get('resolved', ''))
+                for c in data.get('cnames', [])],
+        topInitiators=[TrackerRadarInitiator(domain=i.get('domain', '')) for i in data.get('topInitiators', [])],
+    )
+
+
+DECODERS: Dict[str, Callable[[bytes], TrackerRadarDomain]] = {'json': decode_stdlib}
+
+if msgspec is not None:
+    _msgspec_decoder = msgspec.json.Decoder(TrackerRadarDomain)
+
+    def decode_msgspec(raw: bytes) -> TrackerRadarDomain:
+        """Decode only the used fields straight into the typed structs (skips the rest)."""
+        try:
+            return _msgspec_decoder.decode(raw)
+        except msgspec.ValidationError:
+            # Valid JSON with unexpected field types: let the lenient path handle it
+            return decode_stdlib(raw)
+
+    DECODERS['msgspec'] = decode_msgspec
+
+_decode = DECODERS.get('msgspec', decode_stdlib)
+
+
+def set_decoder(name: str):
+    """Select the decoding backend ('auto', 'json' or 'msgspec') for this process."""
+    global _decode
+    if name == 'auto':
+        _decode = DECODERS.get('msgspec', decode_stdlib)
+    elif name in DECODERS:
+        _decode = DECODERS[name]
+    else:
+        raise ValueError(f"Decoder '{name}' is not available (have: {', '.join(sorted(DECODERS))})")
+
+
+def decoder_name() -> str:
+    """Name of the decoding backend currently selected."""
+    return next(name for name, decode in DECODERS.items() if decode is _decode)
+
+
 def parse_duckduckgo_domain(filepath: Path) -> Optional[Dict]:
     """Parse a single DuckDuckGo domain JSON file."""
     try:
-        with open(filepath) as f:
-            data = json.load(f)
-    except (json.JSONDecodeError, IOError):
+        raw = filepath.read_bytes()
+    except IOError:
         return None
+    return parse_duckduckgo_bytes(raw, filepath)
+
 
-    domain = data.get('domain', filepath.stem)
+def parse_duckduckgo_bytes(raw: bytes, filepath: PurePath) -> Optional[Dict]:
+    """Parse the raw contents of a DuckDuckGo domain JSON file."""
+    return parse_with_reason(raw, filepath)[0]
 
+
+def parse_with_reason(raw: bytes, filepath: PurePath) -> Tuple[Optional[Dict], Optional[str]]:
+    """Like parse_duckduckgo_bytes(), plus why the file was skipped (None if it wasn't)."""
+    try:
+        data = _decode(raw)
+    except ValueError:
+        return None, 'decode_error'
+    vendor = build_vendor(data, filepath.stem)
+    if vendor is None:
+        return None, skip_reason(data.domain if data.domain is not None else filepath.stem)
+    return vendor, None
+
+
+def skip_reason(domain: str) -> Optional[str]:
+    """Why a Tracker Radar domain is not imported, or None."""
     # Skip IP addresses and weird entries
     if re.match(r'^\d+\.\d+\.\d+\.\d+$', domain):
-        return None
-    if domain.startswith('_') or len(domain) < 4:
+        return 'ip_address'
+    if domain.startswith('_'):
+        return 'underscore_prefix'
+    if len(domain) < 4:
+        return 'too_short'
+    return None
+
+
+def build_vendor(data: TrackerRadarDomain, fallback_domain: str) -> Optional[Dict]:
+    """Build an ETALON vendor record from decoded Tracker Radar tracker data."""
+    domain = data.domain if data.domain is not None else fallback_domain
+
+    if skip_reason(domain):
         return None
 
     # Get owner info
-    owner = data.get('owner', {})
-    company = owner.get('name', 'Unknown')
-    display_name = owner.get('displayName', company)
-    privacy_policy = owner.get('privacyPolicy', '')
+    company = data.owner.name
+    display_name = data.owner.displayName if data.owner.displayName is not None else company
+    privacy_policy = data.owner.privacyPolicy
 
     # Get categories
-    categories = data.get('categories', [])
+    categories = data.categories
     primary_category = map_category(categories)
 
     # Build domains list (main + subdomains)
     domains = [domain]
-    for sub in data.get('subdomains', []):
+    for sub in data.subdomains:
         if sub:
             domains.append(f"{sub}.{domain}")
 
     # Aggregate cookie usage from resources
     max_cookies = 0
-    for resource in data.get('resources', []):
-        c = resource.get('cookies', 0)
+    for resource in data.resources:
+        c = resource.cookies
         if c > max_cookies:
             max_cookies = c
 
     # Calculate risk score
     tracker_data = {
-        'prevalence': data.get('prevalence', 0),
-        'fingerprinting': data.get('fingerprinting', 0),
+        'prevalence': data.prevalence,
+        'fingerprinting': data.fingerprinting,
         'cookies': max_cookies,
         'categories': categories,
     }
@@ -146,128 +402,1940 @@ def parse_duckduckgo_domain(filepath: Path) -> Optional[Dict]:
         'name': display_name if display_name != 'Unknown' else domain,
         'company': company,
         'category': primary_category,
+        'category_mask': map_category_mask(categories),
         'gdpr_compliant': False,  # Unknown for auto-imported
         'risk_score': risk_score,
         'tier': 'standard',
         'source': 'duckduckgo-tracker-radar',
-        'prevalence': data.get('prevalence', 0),
-        'fingerprinting': data.get('fingerprinting', 0),
+        'prevalence': data.prevalence,
+        'fingerprinting': data.fingerprinting,
         'cookies': max_cookies,
-        'sites': data.get('sites', 0),
+        'sites': data.sites,
+        'ddg_categories': categories,
     }
 
     if privacy_policy:
         vendor['privacy_policy'] = privacy_policy
 
+    # Underscore fields feed side artifacts and are dropped from the vendor record
+    cnames = sorted({(c.original.lower(), c.resolved.lower()) for c in data.cnames if c.original and c.resolved})
+    if cnames:
+        vendor['_cnames'] = [list(pair) for pair in cnames]
+    resources = [[r.rule, r.type, r.cookies, r.fingerprinting, r.prevalence, r.sites]
+                 for r in data.resources if r.rule]
+    if resources:
+        vendor['_resources'] = resources
+    initiators = sorted({i.domain.lower() for i in data.topInitiators if i.domain and i.domain.lower() != domain})
+    if initiators:
+        vendor['_initiators'] = initiators
+
     return vendor
 
 
-def import_duckduckgo_tracker_radar():
-    """Import all DuckDuckGo Tracker Radar domains from all country folders."""
-    base_path = Path(__file__).parent.parent / 'data' / 'imports' / 'duckduckgo'
-    domains_path = base_path / 'domains'
+class DomainEntry(NamedTuple):
+    """One Tracker Radar domain file, either on disk or inside an archive."""
+    key: str  # '<country>/<domain>.json', same for both input kinds
+    size: int
+    mtime_ns: int
+    path: Optional[Path] = None  # On-disk file, read lazily (in pool workers when parallel)
+    read: Optional[Callable[[], bytes]] = None  # Archive member reader, must be called in order
 
-    if not domains_path.exists():
-        print(f"❌ DuckDuckGo data not found at {domains_path}")
+
+class ParseResult(NamedTuple):
+    """Outcome of _read_and_parse() for one file, with its timings."""
+    pid: int  # Worker process
+    digest: Optional[str]  # Content hash, None if unreadable
+    changed: bool  # False when the hash matched the manifest (not parsed)
+    vendor: Optional[Dict]
+    skip: Optional[str]  # Skip reason when parsed but not imported
+    size: int  # Bytes read
+    read_seconds: float
+    parse_seconds: float
+
+
+def _read_and_parse(job: Tuple[str, Optional[Path], Optional[bytes], Optional[str], float]) -> ParseResult:
+    """
+    Read, hash and parse one domain file (runs in pool workers too).
+    Parsing is skipped when the content hash matches the one already known
+    from the manifest. `read_seconds` in the job is the time spent reading
+    `raw` ahead of the parser, if it was.
+    """
+    key, filepath, raw, known_hash, read_seconds = job
+    if raw is None:
+        start = time.perf_counter()
+        try:
+            raw = filepath.read_bytes()
+        except IOError:
+            return ParseResult(os.getpid(), None, True, None, 'io_error', 0, time.perf_counter() - start, 0.0)
+        read_seconds = time.perf_counter() - start
+
+    digest = hashlib.sha256(raw).hexdigest()
+    if digest == known_hash:
+        return ParseResult(os.getpid(), digest, False, None, None, len(raw), read_seconds, 0.0)
+    start = time.perf_counter()
+    vendor, skip = parse_with_reason(raw, filepath or PurePosixPath(key))
+    return ParseResult(os.getpid(), digest, True, vendor, skip, len(raw), read_seconds, time.perf_counter() - start)
+
+
+def _parse_batch(jobs: List[Tuple]) -> List[ParseResult]:
+    return [_read_and_parse(job) for job in jobs]
+
+
+def parse_jobs(items: Iterable[Tuple[DomainEntry, Optional[Tuple]]], workers: int,
+               decoder: str = 'auto') -> Iterator[Tuple[DomainEntry, Optional[ParseResult]]]:
+    """
+    Hash and parse planned (entry, job) items, serially or in a process pool.
+    Yields (entry, result) in input order, so merging gives exactly the same
+    output as a serial run. result is None for entries without a job.
+    """
+    if workers <= 1:
+        for entry, job in items:
+            yield entry, (_read_and_parse(job) if job else None)
+        return
+
+    def drain(batch, future):
+        results = iter(future.result())
+        for entry, job in batch:
+            yield entry, (next(results) if job else None)
+
+    items = iter(items)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_decoder, initargs=(decoder,)) as pool:
+        while True:
+            batch = list(islice(items, PARSE_BATCH_SIZE))
+            if not batch:
+                break
+            pending.append((batch, pool.submit(_parse_batch, [job for _, job in batch if job])))
+            # Bound the in-flight batches so archive contents aren't all held in memory
+            if len(pending) >= workers * 2:
+                yield from drain(*pending.popleft())
+        while pending:
+            yield from drain(*pending.popleft())
+
+
+def _prefetch(items: Iterable, depth: int) -> Iterator:
+    """Run an iterator in a background thread, buffering up to `depth` items ahead."""
+    buffer = queue.Queue(maxsize=depth)
+    done = object()
+
+    def produce():
+        try:
+            for item in items:
+                buffer.put(item)
+        except BaseException as e:
+            buffer.put(e)
+        buffer.put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = buffer.get()
+        if item is done:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+# Upper bounds (ms) of the read/parse time histogram buckets; the last bucket is open
+TIMING_BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000]
+SLOWEST_FILES = 20
+PROGRESS_EVERY = 5000
+
+
+class ParseTelemetry:
+    """
+    Per-file instrumentation of the read/parse stage: skip reasons, read and
+    parse time histograms, the slowest files, bytes, throughput and
+    per-worker counts. Read and parse times are summed over workers, so with
+    --workers they can exceed the wall-clock time.
+    """
+
+    def __init__(self, slowest: int = SLOWEST_FILES):
+        self.started = time.perf_counter()
+        self.files = 0
+        self.parsed = 0
+        self.unchanged = 0
+        self.skipped = {}
+        self.bytes_read = 0
+        self.read_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.read_histogram = [0] * (len(TIMING_BUCKETS_MS) + 1)
+        self.parse_histogram = [0] * (len(TIMING_BUCKETS_MS) + 1)
+        self.slowest_count = slowest
+        self.slowest = []  # Min-heap of (seconds, key, size, read_seconds, parse_seconds)
+        self.workers = {}  # Worker pid → parsed/skipped/unchanged counts
+
+    def record(self, key: str, result: Optional[ParseResult], skip: Optional[str] = None):
+        """
+        Count one file. `result` is None when the manifest covered it
+        without reading; `skip` is the (cached) skip reason of unparsed files.
+        """
+        self.files += 1
+        if result is not None and result.changed:
+            skip = result.skip
+            self.parsed += result.vendor is not None
+        else:
+            self.unchanged += 1
+        if skip:
+            self.skipped[skip] = self.skipped.get(skip, 0) + 1
+        if result is None:
+            return
+
+        stats = self.workers.setdefault(result.pid, {'parsed': 0, 'skipped': 0, 'unchanged': 0})
+        if not result.changed:
+            stats['unchanged'] += 1
+        else:
+            stats['parsed' if result.vendor is not None else 'skipped'] += 1
+        self.bytes_read += result.size
+        self.read_seconds += result.read_seconds
+        self.parse_seconds += result.parse_seconds
+        self.read_histogram[bisect.bisect_left(TIMING_BUCKETS_MS, result.read_seconds * 1000)] += 1
+        if result.changed:
+            self.parse_histogram[bisect.bisect_left(TIMING_BUCKETS_MS, result.parse_seconds * 1000)] += 1
+        row = (result.read_seconds + result.parse_seconds, key, result.size, result.read_seconds, result.parse_seconds)
+        if len(self.slowest) < self.slowest_count:
+            heapq.heappush(self.slowest, row)
+        elif row > self.slowest[0]:
+            heapq.heapreplace(self.slowest, row)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def rate(self) -> float:
+        return self.files / max(self.elapsed(), 1e-9)
+
+    def report(self, **context) -> Dict:
+        elapsed = self.elapsed()
+        return dict(context, **{
+            'files': self.files,
+            'parsed': self.parsed,
+            'unchanged': self.unchanged,
+            'skipped': dict(sorted(self.skipped.items())),
+            'bytes_read': self.bytes_read,
+            'wall_seconds': round(elapsed, 3),
+            'files_per_second': round(self.files / max(elapsed, 1e-9), 1),
+            'mb_per_second': round(self.bytes_read / 1e6 / max(elapsed, 1e-9), 2),
+            'read_seconds': round(self.read_seconds, 3),
+            'parse_seconds': round(self.parse_seconds, 3),
+            'histogram_buckets_ms': TIMING_BUCKETS_MS,
+            'read_time_histogram': self.read_histogram,
+            'parse_time_histogram': self.parse_histogram,
+            'slowest_files': [
+                {'key': key, 'size': size, 'read_ms': round(read * 1000, 3), 'parse_ms': round(parse * 1000, 3)}
+                for _, key, size, read, parse in sorted(self.slowest, reverse=True)
+            ],
+            'per_worker': [dict(stats, pid=pid) for pid, stats in sorted(self.workers.items())],
+        })
+
+    def print_summary(self):
+        elapsed = self.elapsed()
+        print(f"   {self.files} files in {elapsed:.1f}s ({self.rate():.0f} files/s, "
+              f"{self.bytes_read / 1e6 / max(elapsed, 1e-9):.1f} MB/s read); "
+              f"read {self.read_seconds:.1f}s, parse {self.parse_seconds:.1f}s")
+        if self.skipped:
+            print(f"   Skipped: {', '.join(f'{reason} {count}' for reason, count in sorted(self.skipped.items()))}")
+        for _, key, size, read, parse in sorted(self.slowest, reverse=True)[:3]:
+            print(f"   Slow: {key} ({size / 1024:.0f} KB, read {read * 1000:.1f} ms, parse {parse * 1000:.1f} ms)")
+
+    def print_workers(self):
+        print(f"\n   Per-worker counts:")
+        for n, (pid, stats) in enumerate(sorted(self.workers.items()), 1):
+            print(f"     worker {n} (pid {pid}): {stats['parsed']} parsed, {stats['skipped']} skipped, "
+                  f"{stats['unchanged']} unchanged")
+
+
+def load_manifest(manifest_path: Path) -> Dict[str, Dict]:
+    """Load the incremental import manifest (relative path → file entry)."""
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path) as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        print(f"   ⚠️  Unreadable manifest at {manifest_path}, doing a full import")
+        return {}
+    if data.get('version') != MANIFEST_VERSION:
+        print(f"   Manifest version changed, doing a full import")
+        return {}
+    return data.get('files', {})
+
+
+def save_manifest(manifest_path: Path, files: Dict[str, Dict]):
+    """Atomically write the incremental import manifest."""
+    tmp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': MANIFEST_VERSION, 'files': files}, f, separators=(',', ':'))
+    os.replace(tmp_path, manifest_path)
+
+
+class ImportCheckpoint:
+    """
+    Checkpoint of a running import: an append-only JSON Lines log of processed
+    files plus a small cursor file (files done, valid log size), replaced
+    atomically after the log is synced. A crash between the two leaves a log
+    tail past the cursor, which is truncated on resume.
+    """
+
+    def __init__(self, base_path: Path, source_id: str, every: int = CHECKPOINT_EVERY, tag: str = ''):
+        self.log_path = base_path / f'import-checkpoint{tag}.jsonl'
+        self.cursor_path = base_path / f'import-checkpoint{tag}.json'
+        self.source_id = source_id
+        self.every = every
+        self.cursor = 0
+        self.last_key = None
+        self.pending = []
+
+    def start(self, resume: bool) -> List[Dict]:
+        """Return the logged lines to replay when resuming, else reset the checkpoint."""
+        if resume and self.cursor_path.exists():
+            with open(self.cursor_path) as f:
+                state = json.load(f)
+            if (state.get('version') == MANIFEST_VERSION and state.get('source') == self.source_id
+                    and self.log_path.exists()):
+                with open(self.log_path, 'r+b') as f:
+                    f.truncate(state['log_size'])
+                    f.seek(0)
+                    lines = [json.loads(line) for line in f]
+                self.cursor = state['cursor']
+                self.last_key = state.get('last_key')
+                return lines
+            print(f"   ⚠️  Checkpoint is for another source or version, starting over")
+        elif resume:
+            print(f"   No checkpoint found, starting from the beginning")
+        self.clear()
         return []
 
-    print(f"📖 Reading DuckDuckGo Tracker Radar from {domains_path}")
+    def add(self, line: Dict):
+        if not self.every:
+            return
+        self.pending.append(line)
+        if len(self.pending) >= self.every:
+            self.flush()
 
-    # Collect all JSON files from all country folders
+    def flush(self):
+        if not self.pending:
+            return
+        with open(self.log_path, 'ab') as f:
+            for line in self.pending:
+                f.write(json.dumps(line, separators=(',', ':')).encode() + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+            log_size = f.tell()
+        self.cursor += len(self.pending)
+        self.last_key = self.pending[-1]['key']
+        self.pending = []
+
+        tmp_path = self.cursor_path.with_name(self.cursor_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'source': self.source_id, 'cursor': self.cursor,
+                       'last_key': self.last_key, 'log_size': log_size}, f)
+        os.replace(tmp_path, self.cursor_path)
+
+    def clear(self):
+        for path in (self.log_path, self.cursor_path):
+            if path.exists():
+                path.unlink()
+
+
+def collect_domain_files(domains_path: Path) -> List[Path]:
+    """Collect all domain JSON files from all country folders, in a stable order."""
     all_files = []
     for country_dir in sorted(domains_path.iterdir()):
         if country_dir.is_dir():
-            files = list(country_dir.glob('*.json'))
+            files = sorted(country_dir.glob('*.json'))
             print(f"   {country_dir.name}: {len(files)} domain files")
             all_files.extend(files)
+    return all_files
+
+
+def _stat_entry(domains_path: Path, filepath: Path) -> Optional[DomainEntry]:
+    try:
+        st = filepath.stat()
+    except OSError:
+        return None
+    key = filepath.relative_to(domains_path).as_posix()
+    return DomainEntry(key, st.st_size, st.st_mtime_ns, path=filepath)
+
+
+def iter_directory_entries(domains_path: Path, files: List[Path]) -> Iterator[DomainEntry]:
+    """Yield entries for extracted domain files."""
+    for filepath in files:
+        entry = _stat_entry(domains_path, filepath)
+        if entry is not None:
+            yield entry
+
+
+def archive_member_key(name: str) -> Optional[str]:
+    """
+    Map an archive member path to '<country>/<domain>.json'.
+    Accepts '.../domains/<country>/<domain>.json' (a Tracker Radar checkout)
+    or '<country>/<domain>.json' (an archive of the domains folder itself).
+    """
+    parts = PurePosixPath(name).parts
+    if not parts or not parts[-1].endswith('.json'):
+        return None
+    if len(parts) == 2 or (len(parts) >= 3 and parts[-3] == 'domains'):
+        return f"{parts[-2]}/{parts[-1]}"
+    return None
+
+
+def _read_tar_member(tf: tarfile.TarFile, member: tarfile.TarInfo) -> bytes:
+    with tf.extractfile(member) as f:
+        return f.read()
+
+
+def iter_archive_entries(archive_path: Path) -> Iterator[DomainEntry]:
+    """
+    Stream domain file entries from a .zip or .tar(.gz/.bz2/.xz) archive.
+    Members mapping to a key already seen (a repeated member, or the same
+    '<country>/<domain>.json' under two folders) are skipped with a warning,
+    so every key is read once.
+    """
+    seen = set()
+    duplicates = 0
+
+    def first_seen(key: Optional[str], name: str) -> bool:
+        nonlocal duplicates
+        if not key:
+            return False
+        if key in seen:
+            if not duplicates:
+                print(f"   ⚠️  Skipping duplicate archive member {name} ({key} already read)")
+            duplicates += 1
+            return False
+        seen.add(key)
+        return True
+
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as zf:
+            for info in zf.infolist():
+                key = None if info.is_dir() else archive_member_key(info.filename)
+                if first_seen(key, info.filename):
+                    mtime = calendar.timegm(info.date_time + (0, 0, 0))
+                    yield DomainEntry(key, info.file_size, mtime * 10**9, read=partial(zf.read, info))
+    else:
+        # Stream mode: members are decompressed sequentially, never seeked
+        with tarfile.open(archive_path, 'r|*') as tf:
+            for member in tf:
+                key = archive_member_key(member.name) if member.isfile() else None
+                if first_seen(key, member.name):
+                    yield DomainEntry(key, member.size, int(member.mtime) * 10**9,
+                                      read=partial(_read_tar_member, tf, member))
+    if duplicates:
+        print(f"   ⚠️  Skipped {duplicates} duplicate archive members")
+
+
+def _plan_entries(entries: Iterable[DomainEntry], manifest: Dict[str, Dict]) -> Iterator[Tuple[DomainEntry, Optional[Tuple]]]:
+    """
+    Pair each entry with a parse job, or None when the manifest covers it
+    (same size + mtime). Archive members needing work are read here, so when
+    run in the prefetch thread decompression overlaps with parsing.
+    """
+    for entry in entries:
+        yield _plan_entry(entry, manifest)
+
+
+def _plan_entry(entry: DomainEntry, manifest: Dict[str, Dict], read_files: bool = False) -> Tuple[DomainEntry, Optional[Tuple]]:
+    cached = manifest.get(entry.key)
+    if cached and cached['size'] == entry.size and cached['mtime_ns'] == entry.mtime_ns:
+        return entry, None
+
+    start = time.perf_counter()
+    raw = entry.read() if entry.read else None
+    if raw is None and read_files:
+        try:
+            raw = entry.path.read_bytes()
+        except IOError:
+            pass  # Left to the parser, which reports it as unreadable
+    return entry, (entry.key, entry.path, raw, cached['sha256'] if cached else None, time.perf_counter() - start)
+
+
+def plan_files_threaded(domains_path: Path, files: List[Path], manifest: Dict[str, Dict],
+                        io_threads: int, depth: int) -> Iterator[Tuple[DomainEntry, Optional[Tuple]]]:
+    """
+    Like _plan_entries() over extracted files, but stat and read them in an
+    I/O thread pool up to `depth` files ahead of the parser, hiding per-file
+    open/read latency on slow (network) filesystems. Yields in file order.
+    """
+    def plan(filepath: Path) -> Optional[Tuple[DomainEntry, Optional[Tuple]]]:
+        entry = _stat_entry(domains_path, filepath)
+        return None if entry is None else _plan_entry(entry, manifest, read_files=True)
+
+    with ThreadPoolExecutor(max_workers=io_threads) as pool:
+        pending = deque()
+        for filepath in files:
+            pending.append(pool.submit(plan, filepath))
+            if len(pending) >= depth:
+                item = pending.popleft().result()
+                if item is not None:
+                    yield item
+        while pending:
+            item = pending.popleft().result()
+            if item is not None:
+                yield item
+
+
+def _file_order(key: str) -> Tuple[str, ...]:
+    """Sort key matching the directory walk: country folder, then file name."""
+    return tuple(key.split('/'))
+
+
+def merge_domain_copies(copies: List[Tuple[str, Dict]]) -> Dict:
+    """
+    Merge all country copies of one domain in a single pass: keep the
+    highest-prevalence copy (first one wins ties), union the domains once,
+    and keep per-country prevalence/sites as parallel arrays.
+    """
+    best = None
+    domains = DomainSet()
+    countries, prevalence, sites = [], [], []
+    for country, vendor in copies:
+        domains.update(vendor['domains'])
+        countries.append(country)
+        prevalence.append(vendor.get('prevalence', 0))
+        sites.append(vendor.get('sites', 0))
+        if best is None or vendor.get('prevalence', 0) > best.get('prevalence', 0):
+            best = vendor
+
+    # Copy so merging never mutates the cached manifest records
+    merged = {k: v for k, v in best.items() if not k.startswith('_')}
+    merged['domains'] = domains.sorted()
+    merged['countries'] = countries
+    merged['country_prevalence'] = prevalence
+    merged['country_sites'] = sites
+    return merged
+
+
+def consolidate_by_entity(vendors: List[Dict]) -> Tuple[List[Dict], Dict[str, str]]:
+    """
+    Group per-domain vendors by Tracker Radar owner entity into one vendor per
+    company. The highest-prevalence domain leads (name, category, policy);
+    domains and categories are unioned, prevalence/sites/fingerprinting/cookies
+    and per-country stats take the max over member domains, and the merged
+    vendor is re-scored. Vendors without a known owner are kept as they are.
+    Returns the vendors and a map of replaced vendor ids → entity vendor id.
+    """
+    by_company = {}
+    result = []
+    for vendor in vendors:
+        if vendor['company'] in ('Unknown', ''):
+            result.append(vendor)
+        else:
+            by_company.setdefault(vendor['company'], []).append(vendor)
+
+    used_ids = {v['id'] for v in vendors}
+    id_map = {}
+    consolidated = []
+    for company in sorted(by_company):
+        members = by_company[company]
+        if len(members) == 1:
+            result.append(members[0])
+            continue
+
+        merged = merge_entity(company, members, used_ids.__contains__)
+        used_ids.add(merged['id'])
+        for m in members:
+            id_map[m['id']] = merged['id']
+        consolidated.append(merged)
+
+    score_vendors(consolidated)
+    result.extend(consolidated)
+    result.sort(key=lambda v: v['domains'][0])
+
+    merged_domains = sum(len(by_company[c]) for c in by_company if len(by_company[c]) > 1)
+    print(f"   Consolidated {merged_domains} domains into {len(consolidated)} entity vendors "
+          f"({len(vendors)} → {len(result)} vendors)")
+    return result, id_map
+
+
+def merge_entity(company: str, members: List[Dict], taken: Callable[[str], bool]) -> Dict:
+    """
+    Merge the per-domain vendors of one owner entity (see
+    consolidate_by_entity()), unscored. The entity is named after the
+    company unless `taken` says that id belongs to another vendor.
+    """
+    lead = max(members, key=lambda v: v.get('prevalence', 0))  # First wins ties
+    entity_id = sanitize_id(company)
+    if not entity_id or (taken(entity_id) and entity_id not in {m['id'] for m in members}):
+        entity_id = lead['id']
+
+    merged = dict(lead)
+    merged['id'] = entity_id
+    merged['domains'] = sorted({d for m in members for d in m['domains']})
+    merged['ddg_categories'] = sorted({c for m in members for c in m.get('ddg_categories', [])})
+    merged['category_mask'] = 0
+    for m in members:
+        merged['category_mask'] |= m.get('category_mask', 0)
+    for key in ('prevalence', 'sites', 'fingerprinting', 'cookies'):
+        merged[key] = max(m.get(key, 0) for m in members)
+
+    regional = {}
+    for m in members:
+        for country, prevalence, sites in zip(m.get('countries', []), m.get('country_prevalence', []),
+                                              m.get('country_sites', [])):
+            best_prevalence, best_sites = regional.get(country, (0, 0))
+            regional[country] = (max(best_prevalence, prevalence), max(best_sites, sites))
+    if regional:
+        merged['countries'] = sorted(regional)
+        merged['country_prevalence'] = [regional[c][0] for c in merged['countries']]
+        merged['country_sites'] = [regional[c][1] for c in merged['countries']]
+    return merged
+
+
+# Prevalence history row-group columns: (name, array typecode), little-endian.
+# Floats are stored as float32, plenty for trends and movers.
+HISTORY_COLUMNS = [
+    ('domain_id', 'I'),
+    ('prevalence', 'f'),
+    ('sites', 'I'),
+    ('fingerprinting', 'B'),
+    ('cookies', 'f'),
+]
+HISTORY_VERSION = 1
+
+
+def prevalence_rows(vendors: List[Dict]) -> List[Tuple[str, float, int, int, float]]:
+    """(domain, prevalence, sites, fingerprinting, cookies) of per-domain vendor records."""
+    return [(_record_domain(v), v.get('prevalence', 0), v.get('sites', 0),
+             v.get('fingerprinting', 0), v.get('cookies', 0)) for v in vendors]
+
+
+class PrevalenceHistory:
+    """
+    Append-only columnar prevalence history, one row group per Tracker Radar
+    release. The directory holds:
+      domains.txt    domain dictionary, one per line (line number = domain id)
+      columns.bin    row groups, each column stored contiguously, rows sorted by domain id
+      releases.json  row-group index; bytes past the sizes it records are
+                     leftovers of an interrupted append and are truncated
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.domains_path = self.path / 'domains.txt'
+        self.data_path = self.path / 'columns.bin'
+        self.index_path = self.path / 'releases.json'
+        self.index = {'version': HISTORY_VERSION, 'domains': 0, 'domains_bytes': 0, 'data_bytes': 0, 'releases': []}
+        if self.index_path.exists():
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+        self._domains = None
+        self._ids = None
+
+    @property
+    def releases(self) -> List[str]:
+        return [r['release'] for r in self.index['releases']]
+
+    def domains(self) -> List[str]:
+        if self._domains is None:
+            self._domains = []
+            if self.domains_path.exists():
+                with open(self.domains_path, 'rb') as f:
+                    raw = f.read(self.index['domains_bytes'])
+                self._domains = raw.decode().split('\n')[:self.index['domains']]
+        return self._domains
+
+    def domain_ids(self) -> Dict[str, int]:
+        if self._ids is None:
+            self._ids = {d: i for i, d in enumerate(self.domains())}
+        return self._ids
+
+    def append(self, release: str, rows: Iterable[Tuple[str, float, int, int, float]]) -> int:
+        """Add one release as a new row group; returns its row count."""
+        if release in self.releases:
+            raise ValueError(f"release {release} is already recorded")
+
+        ids = self.domain_ids()
+        new_domains = []
+        by_id = {}
+        for domain, *values in rows:
+            if domain not in ids:
+                ids[domain] = len(ids)
+                self._domains.append(domain)
+                new_domains.append(domain)
+            by_id[ids[domain]] = values
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.domains_path, 'ab') as f:
+            f.truncate(self.index['domains_bytes'])
+            f.seek(self.index['domains_bytes'])
+            if new_domains:
+                f.write(''.join(d + '\n' for d in new_domains).encode())
+            f.flush()
+            os.fsync(f.fileno())
+            domains_bytes = f.tell()
+
+        order = sorted(by_id)
+        columns = [array('I', order)]
+        for n, (_, typecode) in enumerate(HISTORY_COLUMNS[1:]):
+            cast = float if typecode == 'f' else int
+            columns.append(array(typecode, (cast(by_id[i][n]) for i in order)))
+
+        offsets = {}
+        with open(self.data_path, 'ab') as f:
+            f.truncate(self.index['data_bytes'])
+            f.seek(self.index['data_bytes'])
+            for (name, _), column in zip(HISTORY_COLUMNS, columns):
+                offsets[name] = f.tell()
+                if sys.byteorder != 'little':
+                    column.byteswap()
+                f.write(column.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+            data_bytes = f.tell()
+
+        self.index['releases'].append({
+            'release': release,
+            'recorded': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'rows': len(order),
+            'columns': offsets,
+        })
+        self.index.update(domains=len(ids), domains_bytes=domains_bytes, data_bytes=data_bytes)
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+        return len(order)
+
+    def _read_column(self, f, group: Dict, name: str) -> array:
+        typecode = dict(HISTORY_COLUMNS)[name]
+        column = array(typecode)
+        f.seek(group['columns'][name])
+        column.frombytes(f.read(group['rows'] * column.itemsize))
+        if sys.byteorder != 'little':
+            column.byteswap()
+        return column
+
+    def trend(self, domain: str) -> List[Tuple[str, Optional[Dict]]]:
+        """(release, {column: value} or None if absent) for every release, oldest first."""
+        if not self.index['releases']:
+            return []
+        domain_id = self.domain_ids().get(domain)
+        result = []
+        with open(self.data_path, 'rb') as f:
+            for group in self.index['releases']:
+                row = None
+                if domain_id is not None:
+                    row = self._find_row(f, group, domain_id)
+                values = None
+                if row is not None:
+                    values = {}
+                    for name, typecode in HISTORY_COLUMNS[1:]:
+                        size = struct.calcsize('<' + typecode)
+                        f.seek(group['columns'][name] + row * size)
+                        values[name] = struct.unpack('<' + typecode, f.read(size))[0]
+                result.append((group['release'], values))
+        return result
+
+    def _find_row(self, f, group: Dict, domain_id: int) -> Optional[int]:
+        # Binary search in the sorted domain_id column, reading only the probed rows
+        base = group['columns']['domain_id']
+        lo, hi = 0, group['rows']
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f.seek(base + mid * 4)
+            value = struct.unpack('<I', f.read(4))[0]
+            if value < domain_id:
+                lo = mid + 1
+            elif value > domain_id:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def movers(self, limit: int = 20, column: str = 'prevalence') -> List[Tuple[str, float, float]]:
+        """
+        The `limit` domains whose `column` changed most between the previous
+        and the latest release, as (domain, before, after); domains that
+        appeared or disappeared count from / to 0, unchanged ones are left out.
+        """
+        groups = self.index['releases'][-2:]
+        if len(groups) < 2:
+            return []
+        with open(self.data_path, 'rb') as f:
+            before, after = (dict(zip(self._read_column(f, g, 'domain_id'), self._read_column(f, g, column)))
+                             for g in groups)
+        changed = ((i, before.get(i, 0), after.get(i, 0)) for i in before.keys() | after.keys()
+                   if before.get(i, 0) != after.get(i, 0))
+        top = heapq.nlargest(limit, changed, key=lambda row: (abs(row[2] - row[1]), -row[0]))
+        domains = self.domains()
+        return [(domains[i], b, a) for i, b, a in top]
+
+
+def history_path() -> Path:
+    return Path(__file__).parent.parent / 'data' / 'prevalence-history-duckduckgo'
+
+
+def default_release_label(source: Optional[Path]) -> str:
+    """The Tracker Radar checkout's git revision, or today's date (UTC)."""
+    domains_path = Path(source) if source else Path(__file__).parent.parent / 'data' / 'imports' / 'duckduckgo' / 'domains'
+    if domains_path.is_dir():
+        try:
+            return subprocess.run(['git', '-C', str(domains_path), 'rev-parse', '--short', 'HEAD'],
+                                  capture_output=True, check=True).stdout.decode().strip()
+        except (OSError, subprocess.CalledProcessError):
+            pass
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+
+def record_prevalence_history(rows: List[Tuple[str, float, int, int, float]], release: str):
+    """Append this import to the prevalence history as release `release`."""
+    history = PrevalenceHistory(history_path())
+    try:
+        count = history.append(release, rows)
+    except ValueError as e:
+        print(f"   ⚠️  Prevalence history not updated: {e}")
+        return
+    size = history.index['data_bytes'] + history.index['domains_bytes']
+    print(f"💾 Recorded release {release} ({count} domains) in: {history.path}")
+    print(f"   {len(history.releases)} releases, {size / 1024 / 1024:.1f} MB")
+
+
+def print_trend(name: str):
+    """Print the prevalence history of a domain (or Tracker Radar vendor id)."""
+    history = PrevalenceHistory(history_path())
+    if not history.releases:
+        print(f"❌ No prevalence history yet, record a release with --history first")
+        return
+    domain = name
+    if name not in history.domain_ids():
+        domain = next((d for d in history.domains() if sanitize_id(d) == name), name)
+    print(f"📈 Prevalence trend for {domain} ({len(history.releases)} releases)")
+    print(f"   {'release':<14} {'prevalence':>10} {'sites':>8} {'fp':>3} {'cookies':>8}")
+    for release, values in history.trend(domain):
+        if values is None:
+            print(f"   {release:<14} {'-':>10}")
+        else:
+            print(f"   {release:<14} {values['prevalence']:>10.5f} {values['sites']:>8} "
+                  f"{values['fingerprinting']:>3} {values['cookies']:>8.5f}")
+
+
+def print_movers(limit: int):
+    """Print the biggest prevalence movers of the latest release."""
+    history = PrevalenceHistory(history_path())
+    if len(history.releases) < 2:
+        print(f"❌ Need at least two recorded releases, have {len(history.releases)}")
+        return
+    print(f"📊 Biggest prevalence movers {history.releases[-2]} → {history.releases[-1]}")
+    for domain, before, after in history.movers(limit):
+        print(f"   {after - before:+.5f}  {domain} ({before:.5f} → {after:.5f})")
+
+
+class DomainCopyStore(SqliteStore):
+    """
+    On-disk stand-in for the per-file records dict (--low-memory). Stores
+    each '<country>/<domain>.json' record and hands them back already
+    grouped like group_domain_copies(), one domain at a time.
+    """
+
+    def __init__(self, max_rss_mb: Optional[int] = None):
+        super().__init__(max_rss_mb)
+        self.db.execute('CREATE TABLE copies (domain TEXT, country TEXT, record TEXT, '
+                        'PRIMARY KEY (domain, country)) WITHOUT ROWID')
+
+    def __setitem__(self, key: str, vendor: Optional[Dict]):
+        country, filename = key.split('/')
+        self.add(PurePosixPath(filename).stem, country, vendor, replace=True)
+
+    def add(self, domain: str, country: str, vendor: Optional[Dict], replace: bool = False):
+        """Store one country copy; without `replace` the first copy seen wins."""
+        self.check_rss()
+        verb = 'REPLACE' if replace else 'IGNORE'
+        self.db.execute(f'INSERT OR {verb} INTO copies VALUES (?, ?, ?)', (domain, country, json.dumps(vendor)))
+
+    def clear(self):
+        self.db.execute('DELETE FROM copies')
 
-    print(f"   Total: {len(all_files)} domain files across all countries")
+    def __len__(self) -> int:
+        return self.db.execute('SELECT COUNT(*) FROM copies').fetchone()[0]
 
-    # Parse and deduplicate by domain (keep highest prevalence version)
-    vendors_by_domain = {}
+    def domain_count(self) -> int:
+        return self.db.execute('SELECT COUNT(DISTINCT domain) FROM copies').fetchone()[0]
+
+    def items(self) -> Iterator[Tuple[str, List[Tuple[str, Optional[Dict]]]]]:
+        """(domain, [(country, record), ...]) in domain then country order."""
+        domain, copies = None, []
+        for row_domain, country, record in self.db.execute('SELECT * FROM copies ORDER BY domain, country'):
+            self.check_rss()
+            if row_domain != domain:
+                if copies:
+                    yield domain, copies
+                domain, copies = row_domain, []
+            copies.append((country, json.loads(record)))
+        if copies:
+            yield domain, copies
+
+
+class ArtifactEntries:
+    """
+    Entries of the side artifacts (CNAME pairs, resource rules, initiator
+    edges) collected while vendors are built, in memory.
+    """
+
+    def __init__(self):
+        self._cnames = set()
+        self._resources = []
+        self._initiators = set()
+        self._renamed = {}
+
+    def add(self, vendor_id: str, domain: str, record: Dict):
+        """Collect the entries of one country copy of `domain`."""
+        for alias, target in record.get('_cnames', ()):
+            self._cnames.add((vendor_id, domain, (alias, target)))
+        for resource in record.get('_resources', ()):
+            self._resources.append((vendor_id, resource))
+        for initiator in record.get('_initiators', ()):
+            self._initiators.add((initiator, domain))
+
+    def rename(self, id_map: Union[Dict[str, str], Iterable[Tuple[str, str]]]):
+        """Credit the entries of replaced vendor ids to their entity vendor (a dict or id pairs)."""
+        self._renamed.update(id_map)
+
+    # The accessors return entries sorted and deduplicated as the artifact
+    # builders expect them with presorted=True
+
+    def cnames(self) -> Iterable[Tuple[str, str, Tuple[str, str]]]:
+        return sorted({(self._renamed.get(vid, vid), domain, pair) for vid, domain, pair in self._cnames})
+
+    def resources(self) -> Iterable[Tuple[str, List]]:
+        return sorted(((self._renamed.get(vid, vid), resource) for vid, resource in self._resources),
+                      key=lambda e: e[0])
+
+    def initiators(self) -> Iterable[Tuple[str, str]]:
+        return sorted(self._initiators)
+
+
+class SqliteArtifactEntries:
+    """ArtifactEntries kept in the tables of a SQLite store (--low-memory)."""
+
+    def __init__(self, store: SqliteStore):
+        self.store = store
+        self.db = store.db
+        self.db.execute('CREATE TABLE cnames (vendor TEXT, domain TEXT, alias TEXT, target TEXT, '
+                        'PRIMARY KEY (vendor, domain, alias, target)) WITHOUT ROWID')
+        self.db.execute('CREATE TABLE resources (seq INTEGER PRIMARY KEY, vendor TEXT, resource TEXT)')
+        self.db.execute('CREATE TABLE initiators (loader TEXT, loaded TEXT, PRIMARY KEY (loader, loaded)) WITHOUT ROWID')
+        self.db.execute('CREATE TABLE renamed (id TEXT PRIMARY KEY, entity TEXT) WITHOUT ROWID')
+
+    def add(self, vendor_id: str, domain: str, record: Dict):
+        self.store.check_rss()
+        self.db.executemany('INSERT OR IGNORE INTO cnames VALUES (?, ?, ?, ?)',
+                            ((vendor_id, domain, alias, target) for alias, target in record.get('_cnames', ())))
+        self.db.executemany('INSERT INTO resources (vendor, resource) VALUES (?, ?)',
+                            ((vendor_id, json.dumps(resource)) for resource in record.get('_resources', ())))
+        self.db.executemany('INSERT OR IGNORE INTO initiators VALUES (?, ?)',
+                            ((initiator, domain) for initiator in record.get('_initiators', ())))
+
+    def rename(self, id_map: Iterable[Tuple[str, str]]):
+        self.db.executemany('INSERT OR REPLACE INTO renamed VALUES (?, ?)', id_map)
+
+    # Sorting and deduplication happen in SQLite, so the artifact builders
+    # stream the rows (presorted=True) instead of sorting them in memory
+
+    def cnames(self) -> Iterator[Tuple[str, str, Tuple[str, str]]]:
+        for vid, domain, alias, target in self.db.execute(
+                'SELECT DISTINCT COALESCE(r.entity, c.vendor) AS vid, c.domain, c.alias, c.target '
+                'FROM cnames c LEFT JOIN renamed r ON r.id = c.vendor ORDER BY vid, c.domain, c.alias, c.target'):
+            yield vid, domain, (alias, target)
+
+    def resources(self) -> Iterator[Tuple[str, List]]:
+        for vid, resource in self.db.execute(
+                'SELECT COALESCE(r.entity, s.vendor) AS vid, s.resource '
+                'FROM resources s LEFT JOIN renamed r ON r.id = s.vendor ORDER BY vid, s.seq'):
+            yield vid, json.loads(resource)
+
+    def initiators(self) -> Iterator[Tuple[str, str]]:
+        return iter(self.db.execute('SELECT loader, loaded FROM initiators ORDER BY loader, loaded'))
+
+
+class SqliteEntityVendors:
+    """
+    Per-domain vendors held in the tables of a SQLite store until they are
+    consolidated by entity (--low-memory), instead of in a list.
+    """
+
+    def __init__(self, store: SqliteStore):
+        self.store = store
+        self.db = store.db
+        self.count = 0
+        self.db.execute('CREATE TABLE held (seq INTEGER PRIMARY KEY, id TEXT, company TEXT, body TEXT)')
+        self.db.execute('CREATE INDEX held_ids ON held (id)')
+        self.db.execute('CREATE TABLE entities (first_domain TEXT, phase INTEGER, seq INTEGER, body TEXT)')
+        self.db.execute('CREATE TABLE entity_ids (id TEXT PRIMARY KEY, entity TEXT) WITHOUT ROWID')
+
+    def __len__(self) -> int:
+        return self.count
+
+    def extend(self, vendors: List[Dict]):
+        self.store.check_rss()
+        self.db.executemany('INSERT INTO held VALUES (?, ?, ?, ?)',
+                            ((self.count + i, v['id'], v['company'], json.dumps(v)) for i, v in enumerate(vendors)))
+        self.count += len(vendors)
+
+    def _taken(self, vendor_id: str) -> bool:
+        return self.db.execute('SELECT 1 FROM held WHERE id = ?', (vendor_id,)).fetchone() is not None
+
+    def consolidate_by_entity(self) -> Tuple[Iterator[Dict], Iterator[Tuple[str, str]]]:
+        """
+        consolidate_by_entity() over the held vendors, one company in memory
+        at a time. Returns the vendors, in the same order, and the
+        (replaced vendor id, entity vendor id) pairs.
+        """
+        # Rows are ordered as consolidate_by_entity() sorts them: by first
+        # domain, then unknown owners (0), single-domain companies (1) and
+        # entities (2), each kept in input or company order
+        entity_ids = set()
+        merged_domains = entities = 0
+        pending = []
+
+        def flush():
+            score_vendors([merged for _, merged in pending])
+            self.db.executemany('INSERT INTO entities VALUES (?, 2, ?, ?)',
+                                ((merged['domains'][0], i, json.dumps(merged)) for i, merged in pending))
+            pending.clear()
+
+        rows = self.db.execute('SELECT seq, company, body FROM held ORDER BY company, seq')
+        for i, (company, group) in enumerate(groupby(rows, key=lambda row: row[1])):
+            self.store.check_rss()
+            if company in ('Unknown', ''):
+                for seq, _, body in group:
+                    self.db.execute('INSERT INTO entities VALUES (?, 0, ?, ?)', (json.loads(body)['domains'][0], seq, body))
+                continue
+            members = [json.loads(body) for _, _, body in group]
+            if len(members) == 1:
+                self.db.execute('INSERT INTO entities VALUES (?, 1, ?, ?)',
+                                (members[0]['domains'][0], i, json.dumps(members[0])))
+                continue
+
+            merged = merge_entity(company, members, lambda vid: vid in entity_ids or self._taken(vid))
+            entity_ids.add(merged['id'])
+            self.db.executemany('INSERT OR REPLACE INTO entity_ids VALUES (?, ?)',
+                                ((m['id'], merged['id']) for m in members))
+            merged_domains += len(members)
+            entities += 1
+            pending.append((i, merged))
+            if len(pending) >= SCORE_BATCH:
+                flush()
+        flush()
+
+        result = self.count - merged_domains + entities
+        print(f"   Consolidated {merged_domains} domains into {entities} entity vendors "
+              f"({self.count} → {result} vendors)")
+        vendors = (json.loads(body) for (body,) in
+                   self.db.execute('SELECT body FROM entities ORDER BY first_domain, phase, seq'))
+        return vendors, iter(self.db.execute('SELECT id, entity FROM entity_ids'))
+
+
+def shard_of(domain: str, num_shards: int) -> int:
+    """Stable (process- and machine-independent) shard index of a domain, 0-based."""
+    digest = hashlib.sha1(domain.encode()).digest()
+    return int.from_bytes(digest[:8], 'big') % num_shards
+
+
+def read_tracker_radar_records(source: Optional[Path] = None, workers: int = 1,
+                               full: bool = False, decoder: str = 'auto',
+                               resume: bool = False, checkpoint_every: int = CHECKPOINT_EVERY,
+                               io_threads: int = 0, prefetch_depth: int = PREFETCH_DEPTH,
+                               shard: Optional[Tuple[int, int]] = None,
+                               store: Optional[DomainCopyStore] = None,
+                               report: Optional[Dict] = None) -> Union[Dict[str, Optional[Dict]], DomainCopyStore, None]:
+    """
+    Read and parse every domain file, returning '<country>/<domain>.json' →
+    per-file vendor record (None if skipped), or None if there is no data.
+    `source` is an extracted domains folder (default: data/imports/duckduckgo/domains)
+    or a .zip / .tar.gz archive of a Tracker Radar checkout, read without extracting.
+    Files unchanged since the last run are served from import-manifest.json
+    unless `full` is set. Progress is checkpointed every `checkpoint_every`
+    files (0 disables); `resume` continues from the last checkpoint of an
+    interrupted run. `io_threads` prefetches extracted files' bytes in a
+    thread pool, up to `prefetch_depth` files ahead of the parser.
+    With `shard` = (i, n), only domains assigned to 1-based shard i of n are
+    read, with their own manifest and checkpoint.
+    With a `store`, records are kept on disk in it (and returned) instead of
+    in a dict. The manifest, which holds every record, is then neither read
+    nor updated.
+    The parse report written to import-report.json (skip reasons, timings,
+    per-worker parsed/skipped/unchanged counts) is also stored into `report`
+    when given.
+    """
+    set_decoder(decoder)
+    base_path = Path(__file__).parent.parent / 'data' / 'imports' / 'duckduckgo'
+    source = Path(source) if source else base_path / 'domains'
+
+    if not source.exists():
+        print(f"❌ DuckDuckGo data not found at {source}")
+        return None
+
+    print(f"📖 Reading DuckDuckGo Tracker Radar from {source}")
+
+    def in_shard(key: str) -> bool:
+        return shard is None or shard_of(PurePosixPath(key).stem, shard[1]) == shard[0] - 1
+
+    tag = f'.shard-{shard[0]}-of-{shard[1]}' if shard else ''
+    if shard:
+        print(f"   Shard {shard[0]} of {shard[1]}")
+
+    # Serve unchanged files (same size + mtime) straight from the manifest
+    manifest_path = base_path / f'import-manifest{tag}.json'
+    manifest = {} if full or store is not None else load_manifest(manifest_path)
+
+    new_manifest = {}
+    records = {} if store is None else store
+    countries = {}
+    reparsed = 0
+
+    # Replay files already processed by an interrupted run
+    base_path.mkdir(parents=True, exist_ok=True)
+    checkpoint = ImportCheckpoint(base_path, str(source.resolve()), checkpoint_every, tag)
+    for line in checkpoint.start(resume):
+        key = line['key']
+        records[key] = line['vendor']
+        if line['file'] and store is None:
+            new_manifest[key] = dict(line['file'], vendor=line['vendor'])
+        reparsed += line['changed']
+        country = key.split('/')[0]
+        countries[country] = countries.get(country, 0) + 1
+
+    if source.is_dir():
+        # Collect all JSON files from all country folders
+        files = [f for f in collect_domain_files(source) if in_shard(f.name)]
+        if checkpoint.cursor and (checkpoint.cursor > len(files) or
+                                  files[checkpoint.cursor - 1].relative_to(source).as_posix() != checkpoint.last_key):
+            print(f"   ⚠️  File list changed since the checkpoint, starting over")
+            checkpoint.clear()
+            checkpoint = ImportCheckpoint(base_path, str(source.resolve()), checkpoint_every, tag)
+            records.clear()
+            new_manifest, countries, reparsed = {}, {}, 0
+        files = files[checkpoint.cursor:]
+        entries = iter_directory_entries(source, files)
+    else:
+        entries = (e for e in iter_archive_entries(source) if in_shard(e.key))
+        entries = islice(entries, checkpoint.cursor, None)
+    resumed = checkpoint.cursor
+    if resumed:
+        print(f"   Resuming after {resumed} files from checkpoint")
+
+    # Stat/read/decompress ahead of the parser (optionally in a process pool):
+    # an I/O thread pool for extracted files, or a single reader thread
+    if workers > 1:
+        print(f"   Parsing with {workers} worker processes...")
+    if io_threads > 0 and source.is_dir():
+        print(f"   Prefetching with {io_threads} I/O threads, {prefetch_depth} files ahead")
+        planned = plan_files_threaded(source, files, manifest, io_threads, prefetch_depth)
+    else:
+        planned = _prefetch(_plan_entries(entries, manifest), prefetch_depth)
+
+    telemetry = ParseTelemetry()
+    for entry, result in parse_jobs(planned, workers, decoder):
+        country = entry.key.split('/')[0]
+        countries[country] = countries.get(country, 0) + 1
+
+        if result is None:
+            cached = manifest[entry.key]
+            vendor = cached['vendor']
+            file_entry = {k: v for k, v in cached.items() if k != 'vendor'}
+            changed = False
+        else:
+            changed = result.changed
+            if not changed:
+                cached = manifest[entry.key]
+                vendor = cached['vendor']
+                skip = cached.get('skip')
+            else:
+                reparsed += 1
+                vendor = result.vendor
+                skip = result.skip
+            # Unreadable files (no digest) are never cached
+            file_entry = None if result.digest is None else {
+                'size': entry.size,
+                'mtime_ns': entry.mtime_ns,
+                'sha256': result.digest,
+            }
+            if file_entry and skip:
+                file_entry['skip'] = skip
+        # Manifests written before skip reasons were recorded lack them
+        telemetry.record(entry.key, result, file_entry.get('skip', 'unknown') if vendor is None and file_entry else None)
+        if telemetry.files % PROGRESS_EVERY == 0:
+            print(f"   ... {telemetry.files} files ({telemetry.rate():.0f} files/s)")
+
+        records[entry.key] = vendor
+        if file_entry and store is None:
+            new_manifest[entry.key] = dict(file_entry, vendor=vendor)
+        checkpoint.add({'key': entry.key, 'vendor': vendor, 'file': file_entry, 'changed': changed})
+
+    if not source.is_dir():
+        for country, count in sorted(countries.items()):
+            print(f"   {country}: {count} domain files")
+    print(f"   Total: {len(records)} domain files across all countries")
+
+    removed = len(manifest.keys() - new_manifest.keys())
+    print(f"   Parsed {reparsed} new/changed files, {len(records) - reparsed} unchanged, {removed} removed")
+    telemetry.print_summary()
+
+    if store is None:
+        save_manifest(manifest_path, new_manifest)
+    checkpoint.clear()
+
+    parse_report = telemetry.report(source=str(source), decoder=decoder_name(), workers=workers,
+                                    resumed=resumed, removed=removed)
+    report_path = base_path / f'import-report{tag}.json'
+    with open(report_path, 'w') as f:
+        json.dump(parse_report, f, indent=2)
+    print(f"   Parse report: {report_path}")
+    if report is not None:
+        report.update(parse_report)
+
+    if workers > 1:
+        telemetry.print_workers()
+
+    return records
+
+
+def group_domain_copies(records: Dict[str, Optional[Dict]]) -> Dict[str, List[Tuple[str, Optional[Dict]]]]:
+    """
+    Group per-file records by domain into (country, record) lists, in country
+    order regardless of archive member order.
+    """
+    groups = {}
+    for key in sorted(records, key=_file_order):
+        country, filename = key.split('/')
+        groups.setdefault(PurePosixPath(filename).stem, []).append((country, records[key]))
+    return {domain: groups[domain] for domain in sorted(groups)}
+
+
+def build_tracker_radar_vendors(groups: Union[Dict[str, List[Tuple[str, Optional[Dict]]]], DomainCopyStore],
+                                artifacts: Optional[Dict] = None, consolidate: bool = False,
+                                writer: Optional[VendorWriter] = None) -> List[Dict]:
+    """
+    Deduplicate each domain's country copies once and build the vendor list.
+    `groups` maps domain → (country, record) copies in domain order, as from
+    group_domain_copies() or a DomainCopyStore.
+    Side artifacts built in the same pass (the CNAME index, resource-rule
+    matcher and initiator graph) are stored into `artifacts` when given, and
+    per-domain prevalence rows are appended to artifacts['prevalence_rows']
+    if that list is there.
+    With `consolidate`, domains are grouped into one vendor per owner entity.
+    Vendors are scored in batches of SCORE_BATCH as they are built. A
+    `writer` gets each batch as soon as it is final (as its domains are
+    merged, or after consolidation); the vendors are then not kept, only
+    the side-artifact entries, and an empty list is returned. From a
+    DomainCopyStore, the artifact entries and the vendors awaiting
+    consolidation are kept in its tables rather than in memory.
+    """
+    history = artifacts.get('prevalence_rows') if artifacts is not None else None
+    on_disk = isinstance(groups, DomainCopyStore)
+    vendors = []
+    held = SqliteEntityVendors(groups) if on_disk and consolidate else []  # Awaiting consolidation
+    batch = []
+    stats = ImportStats()
+    entries = None
+    if artifacts is not None:
+        entries = SqliteArtifactEntries(groups) if on_disk else ArtifactEntries()
     errors = 0
 
-    for i, filepath in enumerate(all_files):
+    def emit(final: Iterable[Dict]):
+        for vendor in final:
+            stats.add(vendor)
+            if writer is not None:
+                writer.write(vendor)
+            else:
+                vendors.append(vendor)
+
+    def flush():
+        # Score with the current weights (cached records may predate a tuning)
+        score_vendors(batch)
+        if history is not None:
+            # Per-domain, so the history is the same with or without consolidation
+            history.extend(prevalence_rows(batch))
+        if consolidate:
+            held.extend(batch)
+        else:
+            emit(batch)
+        batch.clear()
+
+    total = groups.domain_count() if on_disk else len(groups)
+    for i, (domain, group) in enumerate(groups.items()):
         if i % 5000 == 0 and i > 0:
-            print(f"   Processed {i}/{len(all_files)}...")
+            print(f"   Merged {i}/{total} domains...")
 
-        vendor = parse_duckduckgo_domain(filepath)
-        if vendor is None:
-            errors += 1
+        copies = [(country, vendor) for country, vendor in group if vendor is not None]
+        errors += len(group) - len(copies)
+        if not copies:
             continue
+        merged = merge_domain_copies(copies)
+        batch.append(merged)
+        if len(batch) >= SCORE_BATCH:
+            flush()
+        if entries is not None:
+            for _, vendor in copies:
+                entries.add(merged['id'], domain, vendor)
+    flush()
 
-        domain = vendor['domains'][0]  # Primary domain
-        existing = vendors_by_domain.get(domain)
+    print(f"\n✅ Imported {len(held) if consolidate else stats.vendors} unique vendors from DuckDuckGo")
+    if errors > 0:
+        print(f"   ⚠️  Skipped {errors} entries (IPs, invalid, etc.)")
 
-        if existing is None:
-            vendors_by_domain[domain] = vendor
+    if consolidate:
+        if on_disk:
+            consolidated, id_map = held.consolidate_by_entity()
         else:
-            # Keep the one with higher prevalence
-            if vendor.get('prevalence', 0) > existing.get('prevalence', 0):
-                # Merge domains
-                all_domains = set(existing['domains']) | set(vendor['domains'])
-                vendor['domains'] = sorted(list(all_domains))
-                vendors_by_domain[domain] = vendor
-            else:
-                # Merge new subdomains into existing
-                all_domains = set(existing['domains']) | set(vendor['domains'])
-                existing['domains'] = sorted(list(all_domains))
+            consolidated, id_map = consolidate_by_entity(held)
+        emit(consolidated)
+        if entries is not None:
+            entries.rename(id_map)
+
+    if artifacts is not None:
+        artifacts['cname_index'] = build_cname_index(entries.cnames(), presorted=True)
+        print(f"   CNAME index: {len(artifacts['cname_index']['aliases'])} cloaking aliases → "
+              f"{len(artifacts['cname_index']['vendors'])} vendors")
+        artifacts['resource_rules'] = build_resource_matcher(entries.resources(), presorted=True)
+        print(f"   Resource rules: {len(artifacts['resource_rules']['rules'])} unique rules "
+              f"under {len(artifacts['resource_rules']['hosts'])} hosts")
+        artifacts['initiator_graph'] = build_initiator_graph(entries.initiators(), presorted=True)
+        print(f"   Initiator graph: {len(artifacts['initiator_graph']['domains'])} domains, "
+              f"{len(artifacts['initiator_graph']['targets'])} loader → loaded edges")
+        if on_disk:
+            # The compiled artifacts themselves (the output, not their
+            # entries) are held in memory until saved
+            groups.check_rss()
+
+    stats.print()
+    return vendors
+
+
+def import_duckduckgo_tracker_radar(source: Optional[Path] = None, workers: int = 1,
+                                    full: bool = False, decoder: str = 'auto',
+                                    artifacts: Optional[Dict] = None, consolidate: bool = False,
+                                    resume: bool = False, checkpoint_every: int = CHECKPOINT_EVERY,
+                                    io_threads: int = 0, prefetch_depth: int = PREFETCH_DEPTH,
+                                    low_memory: bool = False, max_rss_mb: Optional[int] = None,
+                                    writer: Optional[VendorWriter] = None, report: Optional[Dict] = None):
+    """
+    Import all DuckDuckGo Tracker Radar domains from all country folders.
+    See read_tracker_radar_records() and build_tracker_radar_vendors() for
+    the options. With `low_memory`, the per-domain dedup state is kept in an
+    on-disk DomainCopyStore sized for `max_rss_mb`, which stops the import
+    if the process goes over it.
+    """
+    if not low_memory:
+        records = read_tracker_radar_records(source, workers=workers, full=full, decoder=decoder,
+                                             resume=resume, checkpoint_every=checkpoint_every,
+                                             io_threads=io_threads, prefetch_depth=prefetch_depth,
+                                             report=report)
+        if records is None:
+            return []
+        return build_tracker_radar_vendors(group_domain_copies(records), artifacts, consolidate, writer)
+
+    with DomainCopyStore(max_rss_mb) as store:
+        print(f"   Low-memory mode: dedup state in {store.path}")
+        if read_tracker_radar_records(source, workers=workers, full=full, decoder=decoder,
+                                      resume=resume, checkpoint_every=checkpoint_every,
+                                      io_threads=io_threads, prefetch_depth=prefetch_depth,
+                                      store=store, report=report) is None:
+            return []
+        vendors = build_tracker_radar_vendors(store, artifacts, consolidate, writer)
+    report_peak_rss(max_rss_mb)
+    return vendors
+
+
+def shard_output_path(shard: Tuple[int, int]) -> Path:
+    return Path(__file__).parent.parent / 'data' / f'vendors-duckduckgo.shard-{shard[0]}-of-{shard[1]}.json'
+
 
-    vendors = list(vendors_by_domain.values())
-    print(f"\n✅ Imported {len(vendors)} unique vendors from DuckDuckGo")
+def import_duckduckgo_shard(shard: Tuple[int, int], **read_options) -> Optional[Path]:
+    """
+    Read one shard of the Tracker Radar domains and write its per-domain
+    country copies as a partial file for reduce_duckduckgo_shards().
+    """
+    records = read_tracker_radar_records(shard=shard, **read_options)
+    if records is None:
+        return None
+
+    groups = records if isinstance(records, DomainCopyStore) else group_domain_copies(records)
+    output_path = shard_output_path(shard)
+    count = 0
+    try:
+        with open(output_path, 'w') as f:
+            # Written a domain at a time so a DomainCopyStore is never loaded whole
+            f.write(f'{{"version":{MANIFEST_VERSION},"shard":[{shard[0]},{shard[1]}],"groups":{{')
+            for domain, copies in groups.items():
+                f.write((',' if count else '') + json.dumps(domain) + ':' + json.dumps(copies, separators=(',', ':')))
+                count += 1
+            f.write('}}')
+    except RssCapExceeded:
+        output_path.unlink()  # Never leave a truncated partial for --reduce
+        raise
+    print(f"\n💾 Saved shard {shard[0]}/{shard[1]} ({count} domains) to: {output_path}")
+    return output_path
+
+
+def reduce_duckduckgo_shards(paths: List[Path], artifacts: Optional[Dict] = None,
+                             consolidate: bool = False, store: Optional[DomainCopyStore] = None,
+                             writer: Optional[VendorWriter] = None, allow_partial: bool = False) -> List[Dict]:
+    """
+    Combine partial shard files into the final vendor list. Country copies of
+    each domain are pooled (a copy seen in several partials counts once) and
+    then go through the same per-domain dedup as a single-node run, so the
+    output is identical to it. With a `store`, they are pooled on disk.
+    Nothing is imported unless all N shards are present, or `allow_partial`.
+    """
+    print(f"📖 Reducing {len(paths)} DuckDuckGo shard files")
+    groups = {}
+    seen_shards = set()
+    num_shards = None
+    for path in paths:
+        with open(path) as f:
+            partial = json.load(f)
+        if partial.get('version') != MANIFEST_VERSION:
+            print(f"❌ {path} was written by another importer version, re-run that shard")
+            return []
+        i, n = partial['shard']
+        if num_shards not in (None, n):
+            print(f"❌ {path} is shard {i}/{n}, expected a shard of {num_shards}")
+            return []
+        num_shards = n
+        seen_shards.add(i)
+        print(f"   {path}: shard {i}/{n}, {len(partial['groups'])} domains")
+        for domain, copies in partial.pop('groups').items():
+            if store is not None:
+                for country, vendor in copies:
+                    store.add(domain, country, vendor)
+                continue
+            pooled = groups.setdefault(domain, {})
+            for country, vendor in copies:
+                pooled.setdefault(country, vendor)
+
+    missing = sorted(set(range(1, (num_shards or 0) + 1)) - seen_shards)
+    if missing and not allow_partial:
+        print(f"❌ Missing shards: {', '.join(map(str, missing))} (pass --allow-partial to reduce without them)")
+        return []
+    if missing:
+        print(f"   ⚠️  Missing shards: {', '.join(map(str, missing))}, reducing without them")
+
+    if store is not None:
+        return build_tracker_radar_vendors(store, artifacts, consolidate, writer)
+    groups = {domain: sorted(groups[domain].items()) for domain in sorted(groups)}
+    return build_tracker_radar_vendors(groups, artifacts, consolidate, writer)
+
+
+def git_changed_domain_files(domains_path: Path, since: str) -> Optional[List[Tuple[str, str]]]:
+    """
+    Ask the local git repository containing `domains_path` which domain files
+    were added (A), modified (M) or deleted (D) between `since` and the
+    working tree. Returns (status, '<country>/<domain>.json') pairs, or None
+    if git fails.
+    """
+    cmd = ['git', '-C', str(domains_path), 'diff', '--name-status', '--no-renames',
+           '--relative', '-z', since, '--', '.']
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout.decode()
+    except (OSError, subprocess.CalledProcessError) as e:
+        stderr = getattr(e, 'stderr', b'') or b''
+        print(f"❌ git diff against {since} failed: {stderr.decode().strip() or e}")
+        return None
+
+    parts = out.split('\0')
+    changes = []
+    for status, key in zip(parts[0::2], parts[1::2]):
+        if len(PurePosixPath(key).parts) == 2 and key.endswith('.json'):
+            changes.append((status[0], key))
+    return changes
+
+
+def _record_domain(vendor: Dict) -> str:
+    """The Tracker Radar domain a per-domain vendor record was built from."""
+    for domain in vendor['domains']:
+        if sanitize_id(domain) == vendor['id']:
+            return domain
+    return vendor['domains'][0]
+
+
+def is_per_domain_record(vendor: Dict) -> bool:
+    """Whether a vendor is one Tracker Radar domain's record, not an entity from --consolidate-entities."""
+    domain = _record_domain(vendor)
+    return sanitize_id(domain) == vendor['id'] and all(d == domain or d.endswith('.' + domain) for d in vendor['domains'])
+
+
+def previous_import_consolidated() -> bool:
+    """Whether the previous vendors-duckduckgo.json (or .jsonl) holds consolidated entity vendors."""
+    previous_path = newest_vendor_file(Path(__file__).parent.parent / 'data' / 'vendors-duckduckgo.json')
+    if not previous_path.exists():
+        return False
+    if previous_path.suffix == '.jsonl':
+        return not all(is_per_domain_record(v) for v in iter_jsonl(previous_path))
+    with open(previous_path) as f:
+        return not all(is_per_domain_record(v) for v in json.load(f))
+
+
+def import_duckduckgo_delta(since: str, source: Optional[Path] = None) -> List[Dict]:
+    """
+    Apply the domain files changed since git revision `since` to the previous
+    vendors-duckduckgo.json (or .jsonl, whichever is newer). Every domain
+    touched by the diff is rebuilt from all of its country copies still on
+    disk (or dropped if none remain); all other records are kept as they
+    are. Side artifacts are not rebuilt.
+    """
+    domains_path = Path(source) if source else Path(__file__).parent.parent / 'data' / 'imports' / 'duckduckgo' / 'domains'
+    previous_path = newest_vendor_file(Path(__file__).parent.parent / 'data' / 'vendors-duckduckgo.json')
+
+    if not domains_path.is_dir():
+        print(f"❌ DuckDuckGo data not found at {domains_path} (--since needs a git checkout)")
+        return []
+    if not previous_path.exists():
+        print(f"❌ No previous import at {previous_path}, run a full import first")
+        return []
+
+    print(f"📖 Reading changes in {domains_path} since {since}")
+    changes = git_changed_domain_files(domains_path, since)
+    if changes is None:
+        return []
+
+    counts = {}
+    for status, _ in changes:
+        counts[status] = counts.get(status, 0) + 1
+    print(f"   {counts.get('A', 0)} added, {counts.get('M', 0)} modified, {counts.get('D', 0)} removed domain files")
+
+    if previous_path.suffix == '.jsonl':
+        by_domain = {_record_domain(v): v for v in iter_jsonl(previous_path)}
+    else:
+        with open(previous_path) as f:
+            by_domain = {_record_domain(v): v for v in json.load(f)}
+
+    country_dirs = sorted(d for d in domains_path.iterdir() if d.is_dir())
+    touched = []
+    errors = 0
+    for domain in sorted({PurePosixPath(key).stem for _, key in changes}):
+        copies = []
+        for country_dir in country_dirs:
+            filepath = country_dir / f"{domain}.json"
+            if filepath.exists():
+                vendor = parse_duckduckgo_domain(filepath)
+                if vendor is None:
+                    errors += 1
+                else:
+                    copies.append((country_dir.name, vendor))
+        if copies:
+            by_domain[domain] = merge_domain_copies(copies)
+            touched.append(by_domain[domain])
+        else:
+            by_domain.pop(domain, None)
+
+    score_vendors(touched)
+    vendors = [by_domain[d] for d in sorted(by_domain)]
+
+    print(f"\n✅ Rebuilt {len(touched)} domains, {len(vendors)} vendors total")
     if errors > 0:
         print(f"   ⚠️  Skipped {errors} entries (IPs, invalid, etc.)")
+    print_import_stats(vendors)
+    return vendors
 
-    # Stats
-    categories = {}
-    risk_distribution = {'low (1-3)': 0, 'medium (4-5)': 0, 'high (6-7)': 0, 'critical (8-10)': 0}
-    for v in vendors:
-        cat = v['category']
-        categories[cat] = categories.get(cat, 0) + 1
-        score = v['risk_score']
+
+def import_duckduckgo_tds(tds_path: Path, consolidate: bool = False) -> List[Dict]:
+    """
+    Import from the single-file Tracker Radar blocklist (TDS: trackers +
+    entities + domains maps). Much faster than walking the per-domain files,
+    but TDS carries no subdomains or site counts, and its tracker-level
+    `cookies` stands in for the max over resources. With `consolidate`,
+    domains are grouped into one vendor per owner entity.
+    """
+    if not tds_path.exists():
+        print(f"❌ TDS file not found at {tds_path}")
+        return []
+
+    print(f"📖 Reading DuckDuckGo TDS blocklist from {tds_path}")
+    with open(tds_path, 'rb') as f:
+        tds = json.load(f)
+
+    entities = tds.get('entities', {})
+    domain_owners = tds.get('domains', {})
+    trackers = tds.get('trackers', {})
+    print(f"   {len(trackers)} trackers, {len(entities)} entities")
+
+    vendors = []
+    errors = 0
+
+    for domain in sorted(trackers):
+        tracker = trackers[domain]
+        owner = tracker.get('owner') or {}
+        # Fall back to the domains → entity map for trackers without an owner block
+        if 'name' not in owner and domain in domain_owners:
+            entity_name = domain_owners[domain]
+            owner = {'name': entity_name, 'displayName': entities.get(entity_name, {}).get('displayName')}
+
+        data = TrackerRadarDomain(
+            domain=tracker.get('domain', domain),
+            owner=TrackerRadarOwner(
+                name=owner.get('name', 'Unknown'),
+                displayName=owner.get('displayName'),
+                privacyPolicy=owner.get('privacyPolicy', ''),
+            ),
+            categories=tracker.get('categories', []),
+            prevalence=tracker.get('prevalence', 0),
+            fingerprinting=tracker.get('fingerprinting', 0),
+            resources=[TrackerRadarResource(cookies=tracker.get('cookies', 0))],
+        )
+        vendor = build_vendor(data, domain)
+        if vendor is None:
+            errors += 1
+            continue
+        vendors.append(vendor)
+
+    print(f"\n✅ Imported {len(vendors)} unique vendors from DuckDuckGo TDS")
+    if errors > 0:
+        print(f"   ⚠️  Skipped {errors} entries (IPs, invalid, etc.)")
+
+    if consolidate:
+        vendors, _ = consolidate_by_entity(vendors)
+
+    print_import_stats(vendors)
+    return vendors
+
+
+class ImportStats:
+    """Category and risk distribution of imported vendors, counted as they are built."""
+
+    def __init__(self):
+        self.vendors = 0
+        self.domains = 0
+        self.categories = {}
+        self.risk_distribution = {'low (1-3)': 0, 'medium (4-5)': 0, 'high (6-7)': 0, 'critical (8-10)': 0}
+
+    def add(self, vendor: Dict):
+        self.vendors += 1
+        self.domains += len(vendor['domains'])
+        cat = vendor['category']
+        self.categories[cat] = self.categories.get(cat, 0) + 1
+        score = vendor['risk_score']
         if score >= 8:
-            risk_distribution['critical (8-10)'] += 1
+            self.risk_distribution['critical (8-10)'] += 1
         elif score >= 6:
-            risk_distribution['high (6-7)'] += 1
+            self.risk_distribution['high (6-7)'] += 1
         elif score >= 4:
-            risk_distribution['medium (4-5)'] += 1
+            self.risk_distribution['medium (4-5)'] += 1
         else:
-            risk_distribution['low (1-3)'] += 1
-
-    total_domains = sum(len(v['domains']) for v in vendors)
-    print(f"\n📊 Statistics:")
-    print(f"   Total vendors: {len(vendors)}")
-    print(f"   Total domains: {total_domains}")
-    print(f"   Categories: {len(categories)}")
-    print(f"\n   Risk distribution:")
-    for k, v in risk_distribution.items():
-        print(f"     {k}: {v}")
-    print(f"\n   Top 10 categories:")
-    for cat, count in sorted(categories.items(), key=lambda x: -x[1])[:10]:
-        print(f"     {cat}: {count}")
+            self.risk_distribution['low (1-3)'] += 1
 
-    return vendors
+    def print(self):
+        print(f"\n📊 Statistics:")
+        print(f"   Total vendors: {self.vendors}")
+        print(f"   Total domains: {self.domains}")
+        print(f"   Categories: {len(self.categories)}")
+        print(f"\n   Risk distribution:")
+        for k, v in self.risk_distribution.items():
+            print(f"     {k}: {v}")
+        print(f"\n   Top 10 categories:")
+        for cat, count in sorted(self.categories.items(), key=lambda x: -x[1])[:10]:
+            print(f"     {cat}: {count}")
 
 
-def save_imported_vendors(vendors: List[Dict]):
-    """Save imported vendors to JSON."""
-    output_path = Path(__file__).parent.parent / 'data' / 'vendors-duckduckgo.json'
-    with open(output_path, 'w') as f:
-        json.dump(vendors, f, indent=2)
+def print_import_stats(vendors: List[Dict]):
+    """Print category and risk distribution of imported vendors."""
+    stats = ImportStats()
+    for v in vendors:
+        stats.add(v)
+    stats.print()
+
+
+def benchmark_decoders(repeat: int = 3):
+    """Compare the available decoding backends on the local Tracker Radar snapshot."""
+    domains_path = Path(__file__).parent.parent / 'data' / 'imports' / 'duckduckgo' / 'domains'
+    if not domains_path.exists():
+        print(f"❌ DuckDuckGo data not found at {domains_path}")
+        return
+
+    # Read everything up front so only decoding + parsing is timed
+    files = collect_domain_files(domains_path)
+    contents = [(filepath, filepath.read_bytes()) for filepath in files]
+    total_bytes = sum(len(raw) for _, raw in contents)
+    print(f"\n⏱️  Benchmarking decoders on {len(contents)} files ({total_bytes / 1e6:.1f} MB), best of {repeat}")
+
+    reference = None
+    for name in sorted(DECODERS):
+        set_decoder(name)
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parsed = [parse_duckduckgo_bytes(raw, filepath) for filepath, raw in contents]
+            best = min(best, time.perf_counter() - start)
+
+        if reference is None:
+            reference = parsed
+        same = '✅ identical' if parsed == reference else '❌ output differs'
+        print(f"   {name:8s} {best:8.3f}s  {len(contents) / best:10.0f} files/s  {total_bytes / 1e6 / best:7.1f} MB/s  {same}")
+
+    if 'msgspec' not in DECODERS:
+        print("   (install msgspec to benchmark the selective decoder)")
+
+
+def rescore_vendor_file(path: Path):
+    """Re-score DuckDuckGo vendors in an existing vendors file in place."""
+    if not path.exists():
+        print(f"❌ Vendor file not found at {path}")
+        return
+
+    if path.suffix == '.jsonl':
+        data = list(iter_jsonl(path))
+    else:
+        with open(path) as f:
+            data = json.load(f)
+
+    # VendorDatabase wrapper (merged vendors.json) vs raw importer list
+    if isinstance(data, dict) and 'vendors' in data:
+        vendors, indent = data['vendors'], 4
+    else:
+        vendors, indent = data, 2
+
+    def fields(vendor: Dict) -> Dict:
+        return vendor.get('_import_metadata', vendor)
+
+    ddg = [v for v in vendors if fields(v).get('source') == 'duckduckgo-tracker-radar']
+    changed = score_vendors(ddg, fields)
+    legacy = sum(1 for v in ddg if 'ddg_categories' not in fields(v))
+
+    print(f"📖 Re-scoring {path}")
+    print(f"   {len(ddg) - legacy} DuckDuckGo vendors scored, {changed} scores changed")
+    if legacy:
+        print(f"   ⚠️  {legacy} vendors lack ddg_categories (imported before batch scoring); re-import to rescore them")
+
+    if changed and path.suffix == '.jsonl':
+        writer = VendorWriter(path)
+        writer.extend(data)
+        writer.close()
+        print(f"\n💾 Saved to: {path}")
+    elif changed:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=indent)
+        print(f"\n💾 Saved to: {path}")
+
+
+def save_imported_vendors(vendors: List[Dict], writer: Optional[VendorWriter] = None):
+    """Save imported vendors to JSON, or finish the JSON Lines `writer`."""
+    if writer is not None:
+        # Streaming imports have already written every vendor
+        if not writer.count:
+            writer.extend(vendors)
+        writer.close()
+        output_path = writer.path
+        count = writer.count
+    else:
+        output_path = Path(__file__).parent.parent / 'data' / 'vendors-duckduckgo.json'
+        with open(output_path, 'w') as f:
+            json.dump(vendors, f, indent=2)
+        count = len(vendors)
     print(f"\n💾 Saved to: {output_path}")
-    print(f"   {len(vendors)} vendors ready to merge")
+    print(f"   {count} vendors ready to merge")
+
+
+def save_cname_index(index: Dict):
+    """Save the CNAME-target → vendor index next to the vendor file."""
+    output_path = Path(__file__).parent.parent / 'data' / 'cname-index-duckduckgo.json'
+    with open(output_path, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    print(f"💾 Saved CNAME index to: {output_path}")
+    print(f"   {len(index['targets'])} CNAME targets, {len(index['aliases'])} aliases")
+
+
+def save_resource_rules(db: Dict):
+    """Save the compiled resource-rule matcher database next to the vendor file."""
+    output_path = Path(__file__).parent.parent / 'data' / 'resource-rules-duckduckgo.json'
+    with open(output_path, 'w') as f:
+        json.dump(db, f, separators=(',', ':'))
+    print(f"💾 Saved resource rules to: {output_path}")
+    print(f"   {len(db['rules'])} rules under {len(db['hosts'])} hosts")
+
+
+def save_initiator_graph(db: Dict):
+    """Save the compiled initiator graph next to the vendor file."""
+    output_path = Path(__file__).parent.parent / 'data' / 'initiator-graph-duckduckgo.json'
+    with open(output_path, 'w') as f:
+        json.dump(db, f, separators=(',', ':'))
+    print(f"💾 Saved initiator graph to: {output_path}")
+    print(f"   {len(db['domains'])} domains, {len(db['targets'])} edges")
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Import DuckDuckGo Tracker Radar into ETALON.')
+    parser.add_argument('--source', type=Path,
+                        help='domains folder or Tracker Radar .zip/.tar.gz archive '
+                             '(default: data/imports/duckduckgo/domains)')
+    parser.add_argument('--tds', type=Path,
+                        help='quick refresh from the single-file TDS blocklist (tds.json) '
+                             'instead of the per-domain files')
+    parser.add_argument('--rescore', type=Path, metavar='VENDORS_JSON',
+                        help='recompute risk scores in an existing vendors file with the current weights and exit')
+    parser.add_argument('--resume', action='store_true',
+                        help='continue an interrupted import from its last checkpoint')
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY, metavar='N',
+                        help=f'checkpoint progress every N files (default: {CHECKPOINT_EVERY}, 0 disables)')
+    parser.add_argument('--shard', metavar='I/N',
+                        help='only import domains assigned to shard I of N (1-based) and write a partial file')
+    parser.add_argument('--reduce', type=Path, nargs='+', metavar='PARTIAL',
+                        help='combine partial shard files into vendors-duckduckgo.json')
+    parser.add_argument('--allow-partial', action='store_true',
+                        help='let --reduce write its output even if some of the N shards are missing')
+    parser.add_argument('--since', metavar='REV',
+                        help='only re-parse domain files changed since this git revision of the '
+                             'Tracker Radar checkout and patch the previous vendors-duckduckgo.json')
+    parser.add_argument('--consolidate-entities', action='store_true',
+                        help='merge domains into one vendor per Tracker Radar owner entity')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='parse domain files in N worker processes (default: 1, serial)')
+    parser.add_argument('--io-threads', type=int, default=0, metavar='N',
+                        help='prefetch domain files with N I/O threads (for slow/network filesystems)')
+    parser.add_argument('--prefetch-depth', type=int, default=PREFETCH_DEPTH, metavar='N',
+                        help=f'how many files to read ahead of the parser (default: {PREFETCH_DEPTH})')
+    parser.add_argument('--full', action='store_true',
+                        help='ignore the incremental import manifest and re-parse every file')
+    parser.add_argument('--jsonl', action='store_true',
+                        help='write vendors-duckduckgo.jsonl (one vendor per line, appended during '
+                             'the import) instead of vendors-duckduckgo.json')
+    parser.add_argument('--low-memory', action='store_true',
+                        help='keep the per-domain dedup state, artifact entries and vendors awaiting '
+                             '--consolidate-entities in an on-disk SQLite store and write vendors as '
+                             'they are built (implies --full: the manifest is not used)')
+    parser.add_argument('--max-rss-mb', type=int, metavar='MB',
+                        help='memory cap for --low-memory (sizes the SQLite cache, '
+                             'stops the import if peak RSS exceeds it; implies --low-memory)')
+    parser.add_argument('--decoder', choices=['auto', 'json', 'msgspec'], default='auto',
+                        help='JSON decoding backend (default: msgspec if installed, else json)')
+    parser.add_argument('--history', action='store_true',
+                        help='append this import to the prevalence history as a new release')
+    parser.add_argument('--release', metavar='LABEL',
+                        help='release label for --history (default: git revision of the '
+                             'Tracker Radar checkout, else today\'s date)')
+    parser.add_argument('--trend', metavar='DOMAIN',
+                        help='print the recorded prevalence history of a domain or vendor id and exit')
+    parser.add_argument('--movers', type=int, nargs='?', const=20, metavar='N',
+                        help='print the N biggest prevalence movers of the latest release (default: 20) and exit')
+    parser.add_argument('--benchmark-decoders', action='store_true',
+                        help='time the available decoders on the local snapshot and exit')
+    args = parser.parse_args()
+    shard = None
+    if args.shard:
+        match = re.match(r'^(\d+)/(\d+)$', args.shard)
+        if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+            parser.error("--shard expects I/N with 1 <= I <= N, e.g. --shard 2/4")
+        shard = (int(match.group(1)), int(match.group(2)))
+    if args.prefetch_depth < 1:
+        parser.error("--prefetch-depth must be at least 1")
+    if args.checkpoint_every < 0:
+        parser.error("--checkpoint-every must be at least 1 (or 0 to disable checkpoints)")
+    low_memory = args.low_memory or args.max_rss_mb is not None
+    modes = [flag for flag, value in (('--shard', shard), ('--reduce', args.reduce),
+                                      ('--since', args.since), ('--tds', args.tds)) if value]
+    if len(modes) > 1:
+        parser.error(f"{' and '.join(modes)} can't be combined")
+    if shard and args.consolidate_entities:
+        parser.error("--shard writes per-domain partials: pass --consolidate-entities to --reduce instead")
+    if args.allow_partial and not args.reduce:
+        parser.error("--allow-partial only applies to --reduce")
+    if low_memory and (args.tds or args.since):
+        parser.error("--low-memory/--max-rss-mb only apply to Tracker Radar domain imports, not --tds or --since")
+    if args.max_rss_mb is not None and args.workers > 1:
+        parser.error("--max-rss-mb can't account for --workers processes: run serially to enforce the cap")
+    if args.since and args.consolidate_entities:
+        parser.error("--since patches per-domain records and can't be combined with --consolidate-entities")
+    if args.since and previous_import_consolidated():
+        parser.error("--since patches per-domain records, but the previous import was made with "
+                     "--consolidate-entities: run a full import instead")
+    if args.history and (args.tds or shard):
+        parser.error("--history needs per-domain prevalence and site counts: not available with --tds or --shard")
+    if args.decoder not in ('auto',) + tuple(DECODERS):
+        parser.error(f"--decoder {args.decoder} is not installed (pip install {args.decoder})")
+
     print("🦆 DuckDuckGo Tracker Radar Import")
     print("=" * 60)
 
-    vendors = import_duckduckgo_tracker_radar()
-    if vendors:
-        save_imported_vendors(vendors)
+    if args.benchmark_decoders:
+        benchmark_decoders()
+        return
+
+    if args.rescore:
+        rescore_vendor_file(args.rescore)
+        return
+
+    if args.trend:
+        print_trend(args.trend)
+        return
+
+    if args.movers is not None:
+        print_movers(args.movers)
+        return
+
+    if shard:
+        try:
+            with DomainCopyStore(args.max_rss_mb) if low_memory else nullcontext() as store:
+                import_duckduckgo_shard(shard, source=args.source, workers=args.workers, full=args.full,
+                                        decoder=args.decoder, resume=args.resume,
+                                        checkpoint_every=args.checkpoint_every,
+                                        io_threads=args.io_threads, prefetch_depth=args.prefetch_depth,
+                                        store=store)
+        except RssCapExceeded as e:
+            print(f"\n❌ {e}")
+            sys.exit(1)
+        if low_memory:
+            report_peak_rss(args.max_rss_mb)
+        return
+
+    artifacts = {}
+    if args.history and not args.since:
+        artifacts['prevalence_rows'] = []  # Filled in a domain at a time as vendors are built
+    output_path = Path(__file__).parent.parent / 'data' / 'vendors-duckduckgo.json'
+    writer = None
+    if args.jsonl:
+        writer = VendorWriter(jsonl_path(output_path))
+    elif low_memory:
+        # Written as they are built, so the vendor list is never held in memory
+        writer = VendorArrayWriter(output_path)
+    if writer is not None:
+        print(f"   Writing vendors to {writer.partial_path}")
+    try:
+        if args.reduce and low_memory:
+            with DomainCopyStore(args.max_rss_mb) as store:
+                vendors = reduce_duckduckgo_shards(args.reduce, artifacts, consolidate=args.consolidate_entities,
+                                                   store=store, writer=writer, allow_partial=args.allow_partial)
+            report_peak_rss(args.max_rss_mb)
+        elif args.reduce:
+            vendors = reduce_duckduckgo_shards(args.reduce, artifacts, consolidate=args.consolidate_entities,
+                                               writer=writer, allow_partial=args.allow_partial)
+        elif args.since:
+            set_decoder(args.decoder)
+            vendors = import_duckduckgo_delta(args.since, source=args.source)
+        elif args.tds:
+            vendors = import_duckduckgo_tds(args.tds, consolidate=args.consolidate_entities)
+        else:
+            vendors = import_duckduckgo_tracker_radar(source=args.source, workers=args.workers,
+                                                      full=args.full, decoder=args.decoder,
+                                                      artifacts=artifacts, consolidate=args.consolidate_entities,
+                                                      resume=args.resume, checkpoint_every=args.checkpoint_every,
+                                                      io_threads=args.io_threads, prefetch_depth=args.prefetch_depth,
+                                                      low_memory=low_memory, max_rss_mb=args.max_rss_mb,
+                                                      writer=writer)
+    except RssCapExceeded as e:
+        if writer is not None:
+            writer.discard()
+        print(f"\n❌ {e}")
+        sys.exit(1)
+
+    # Vendors streamed to the writer aren't returned
+    if vendors or (writer is not None and writer.count):
+        save_imported_vendors(vendors, writer)
+        if 'cname_index' in artifacts:
+            save_cname_index(artifacts['cname_index'])
+        if 'resource_rules' in artifacts:
+            save_resource_rules(artifacts['resource_rules'])
+        if 'initiator_graph' in artifacts:
+            save_initiator_graph(artifacts['initiator_graph'])
+        if args.history:
+            # --since can't consolidate, so its vendors are per-domain records
+            rows = artifacts['prevalence_rows'] if args.since is None else prevalence_rows(vendors)
+            record_prevalence_history(rows, args.release or default_release_label(args.source))
         print("\n✅ Import complete!")
     else:
+        if writer is not None:
+            writer.discard()
         print("\n❌ No vendors imported")
+        sys.exit(1)
 
 
 if __name__ == '__main__':
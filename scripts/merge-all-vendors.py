@@ -2,24 +2,32 @@
 """
 Merge all vendor databases with intelligent deduplication.
 Priority: Premium (existing 177) > DuckDuckGo > Disconnect
+(the SOURCES list; --sources merges another set of feeds)
 
 Produces a unified vendors.json in the ETALON VendorDatabase format.
 """
 
+import argparse
+import bisect
 import json
 import shutil
+import sys
+from collections import deque
+from array import array
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from domain_set import DomainSet
+from sqlite_store import RssCapExceeded, SqliteStore, report_peak_rss
+from tracker_artifacts import remap_saved_artifacts
+from vendor_categories import CATEGORIES, CATEGORY_BITS
+from vendor_jsonl import iter_jsonl, iter_vendor_file, newest_vendor_file
 
 
 # Complete set of ETALON categories (existing + new ones needed for imports)
-VALID_CATEGORIES = {
-    'analytics', 'advertising', 'social', 'cdn', 'payments', 'chat',
-    'heatmaps', 'ab_testing', 'error_tracking', 'tag_manager', 'consent',
-    'video', 'fonts', 'security', 'push', 'forms', 'referral', 'booking',
-    'maps', 'web3', 'b2b_intelligence', 'email_marketing', 'other',
-}
+VALID_CATEGORIES = set(CATEGORIES)
 
 # Category metadata for new categories
 NEW_CATEGORIES = [
@@ -33,12 +41,15 @@ NEW_CATEGORIES = [
 
 
 def load_vendors(filename: str, data_dir: Path) -> List[Dict]:
-    """Load vendor JSON file."""
-    path = data_dir / filename
+    """Load vendor JSON file (or its JSON Lines sibling, if that is newer)."""
+    path = newest_vendor_file(data_dir / filename)
     if not path.exists():
         print(f"  ⚠️  {filename} not found, skipping")
         return []
 
+    if path.suffix == '.jsonl':
+        return list(iter_jsonl(path))
+
     with open(path) as f:
         data = json.load(f)
 
@@ -52,6 +63,23 @@ def load_vendors(filename: str, data_dir: Path) -> List[Dict]:
         return []
 
 
+def iter_vendors(filename: str, data_dir: Path, label: str) -> Iterator[Dict]:
+    """
+    Stream a vendor file (JSON Lines or .json) a vendor at a time, for
+    --low-memory mode.
+    """
+    path = newest_vendor_file(data_dir / filename)
+    if not path.exists():
+        print(f"  ⚠️  {filename} not found, skipping")
+        return
+
+    count = 0
+    for vendor in (iter_jsonl(path) if path.suffix == '.jsonl' else iter_vendor_file(path)):
+        count += 1
+        yield vendor
+    print(f"  {label}: {count} vendors (streamed from {path.name})")
+
+
 def load_categories(data_dir: Path) -> List[Dict]:
     """Load existing categories from vendors.json."""
     path = data_dir / 'vendors.json'
@@ -76,9 +104,10 @@ def normalize_vendor(vendor: Dict) -> Dict:
     # Clamp risk score
     vendor['risk_score'] = max(1, min(10, vendor['risk_score']))
 
-    # Validate category
+    # Validate category; the mask always includes the primary category
     if vendor['category'] not in VALID_CATEGORIES:
         vendor['category'] = 'other'
+    vendor['category_mask'] = vendor.get('category_mask', 0) | CATEGORY_BITS[vendor['category']]
 
     # Lowercase all domains
     vendor['domains'] = [d.lower() for d in vendor['domains'] if d]
@@ -86,129 +115,452 @@ def normalize_vendor(vendor: Dict) -> Dict:
     return vendor
 
 
-def merge_vendors(premium: List[Dict], duckduckgo: List[Dict], disconnect: List[Dict]) -> List[Dict]:
+class VendorIndex:
     """
-    Merge all vendor lists with intelligent deduplication.
-    Priority: premium > duckduckgo > disconnect.
-    Uses domain overlap for deduplication.
+    Vendors by node number (in load order) plus the domain → node claim
+    index, in memory. Only vendors published under an output id are written.
     """
-    # Mark tiers
-    for v in premium:
-        v['tier'] = 'premium'
-    for v in duckduckgo:
-        v.setdefault('tier', 'standard')
-    for v in disconnect:
-        v.setdefault('tier', 'standard')
-
-    # Build domain → vendor_id index from premium first
-    domain_to_id = {}
-    vendors_by_id = {}
-
-    # Pass 1: Index premium vendors (highest priority)
-    for v in premium:
-        v = normalize_vendor(v)
-        vid = v['id']
-        vendors_by_id[vid] = v
-        for domain in v['domains']:
-            domain_to_id[domain] = vid
-
-    print(f"  Indexed {len(vendors_by_id)} premium vendors ({len(domain_to_id)} domains)")
-
-    # Pass 2: Add DuckDuckGo vendors (skip if domain overlap with premium)
-    ddg_added = 0
-    ddg_merged = 0
-    for v in duckduckgo:
-        v = normalize_vendor(v)
-
-        # Check if any domain already belongs to a premium vendor
-        matched_premium_id = None
-        for domain in v['domains']:
-            if domain in domain_to_id:
-                existing_id = domain_to_id[domain]
-                if vendors_by_id[existing_id].get('tier') == 'premium':
-                    matched_premium_id = existing_id
-                    break
-
-        if matched_premium_id:
-            # Enrich premium vendor with additional domains from DDG
-            existing = vendors_by_id[matched_premium_id]
-            new_domains = set(v['domains']) - set(existing['domains'])
-            if new_domains:
-                existing['domains'] = sorted(list(set(existing['domains']) | new_domains))
-                for d in new_domains:
-                    domain_to_id[d] = matched_premium_id
-            ddg_merged += 1
-            continue
 
-        # Check if domain already claimed by another DDG vendor
-        matched_id = None
-        for domain in v['domains']:
-            if domain in domain_to_id:
-                matched_id = domain_to_id[domain]
-                break
-
-        if matched_id:
-            # Merge domains into existing
-            existing = vendors_by_id[matched_id]
-            all_domains = set(existing['domains']) | set(v['domains'])
-            existing['domains'] = sorted(list(all_domains))
-            for d in v['domains']:
-                domain_to_id[d] = matched_id
-            ddg_merged += 1
-        else:
-            # New vendor
-            vid = v['id']
-            # Handle ID collisions
-            if vid in vendors_by_id:
-                vid = f"{vid}-ddg"
-                v['id'] = vid
-            vendors_by_id[vid] = v
-            for d in v['domains']:
-                domain_to_id[d] = vid
-            ddg_added += 1
-
-    print(f"  Added {ddg_added} DuckDuckGo vendors, merged {ddg_merged} into existing")
-
-    # Pass 3: Add Disconnect vendors (fill remaining gaps)
-    dc_added = 0
-    dc_merged = 0
-    for v in disconnect:
-        v = normalize_vendor(v)
-
-        # Check if any domain already claimed
-        matched_id = None
-        for domain in v['domains']:
-            if domain in domain_to_id:
-                matched_id = domain_to_id[domain]
-                break
-
-        if matched_id:
-            # Merge domains into existing
-            existing = vendors_by_id[matched_id]
-            new_domains = set(v['domains']) - set(existing['domains'])
-            if new_domains:
-                existing['domains'] = sorted(list(set(existing['domains']) | new_domains))
-                for d in new_domains:
-                    domain_to_id[d] = matched_id
-            dc_merged += 1
-        else:
-            # New vendor
-            vid = v['id']
-            if vid in vendors_by_id:
-                vid = f"{vid}-dc"
-                v['id'] = vid
-            vendors_by_id[vid] = v
-            for d in v['domains']:
-                domain_to_id[d] = vid
-            dc_added += 1
-
-    print(f"  Added {dc_added} Disconnect vendors, merged {dc_merged} into existing")
+    def __init__(self):
+        self.nodes = []
+        self.domain_to_node = {}
+        # Domains of vendors that others were merged into, sorted once in vendors()
+        self.merged_domains = {}
+        self.published = {}
+
+    def __contains__(self, vid: str) -> bool:
+        """Whether a vendor is already published under `vid`."""
+        return vid in self.published
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def domain_count(self) -> int:
+        return len(self.domain_to_node)
+
+    def add(self, vendor: Dict) -> int:
+        """Add a vendor, returning its node number."""
+        self.nodes.append(vendor)
+        return len(self.nodes) - 1
+
+    def get(self, node: int) -> Dict:
+        return self.nodes[node]
+
+    def ids(self) -> Iterator[Tuple[int, str]]:
+        """(node, vendor id) of every vendor, in node order."""
+        for node, vendor in enumerate(self.nodes):
+            yield node, vendor['id']
+
+    def merge_domains(self, node: int, domains: List[str], resort: bool = False) -> Set[str]:
+        """
+        Merge `domains` into vendor `node`, returning the new ones. Its domain
+        list becomes the sorted union if anything was new (or if `resort`).
+        """
+        if node not in self.merged_domains:
+            self.merged_domains[node] = DomainSet(self.nodes[node]['domains'])
+        accumulator = self.merged_domains[node]
+        new = accumulator.update(domains)
+        accumulator.changed |= resort
+        return new
+
+    def merge_categories(self, node: int, mask: int):
+        """Add the categories in `mask` to vendor `node`."""
+        self.nodes[node]['category_mask'] |= mask
+
+    def owners(self, domains: List[str]) -> Dict[str, int]:
+        """Claiming node of each of `domains` that is already claimed."""
+        return {d: self.domain_to_node[d] for d in domains if d in self.domain_to_node}
+
+    def claim(self, domains: Iterable[str], node: int):
+        for d in domains:
+            self.domain_to_node[d] = node
+
+    def publish(self, node: int, vid: str):
+        """Write vendor `node` out as `vid`, which must not be taken yet."""
+        if vid in self.published:
+            raise ValueError(f"vendor id {vid!r} is already published")
+        self.published[vid] = node
+
+    def vendors(self) -> Iterator[Dict]:
+        """All published vendors in id order."""
+        for vid in sorted(self.published):
+            node = self.published[vid]
+            vendor = self.nodes[node]
+            vendor['id'] = vid
+            accumulator = self.merged_domains.get(node)
+            if accumulator is not None and accumulator.changed:
+                vendor['domains'] = accumulator.sorted()
+            yield vendor
+
+
+class SqliteVendorIndex(SqliteStore):
+    """
+    VendorIndex kept in an on-disk SQLite store (--low-memory), so only the
+    vendor being merged is in memory at a time.
+    """
+
+    # Domains per IN (...) lookup, below SQLite's bound-parameter limit
+    LOOKUP_CHUNK = 500
+
+    # vendors.merged: 0 = untouched, 1 = has merged_domains rows, 2 = domains must be rebuilt from them
+    def __init__(self, max_rss_mb: Optional[int] = None):
+        super().__init__(max_rss_mb)
+        self.db.execute('CREATE TABLE vendors (node INTEGER PRIMARY KEY, id TEXT, output_id TEXT UNIQUE, '
+                        'merged INTEGER, category_mask INTEGER, body TEXT)')
+        self.db.execute('CREATE TABLE domains (domain TEXT PRIMARY KEY, node INTEGER) WITHOUT ROWID')
+        self.db.execute('CREATE TABLE merged_domains (node INTEGER, domain TEXT, '
+                        'PRIMARY KEY (node, domain)) WITHOUT ROWID')
+        self.count = 0
+
+    def __contains__(self, vid: str) -> bool:
+        return self.db.execute('SELECT 1 FROM vendors WHERE output_id = ?', (vid,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def domain_count(self) -> int:
+        return self.db.execute('SELECT COUNT(*) FROM domains').fetchone()[0]
+
+    def add(self, vendor: Dict) -> int:
+        self.check_rss()
+        node = self.count
+        self.db.execute('INSERT INTO vendors VALUES (?, ?, NULL, 0, ?, ?)',
+                        (node, vendor['id'], vendor['category_mask'], json.dumps(vendor)))
+        self.count += 1
+        return node
+
+    def get(self, node: int) -> Dict:
+        mask, body = self.db.execute('SELECT category_mask, body FROM vendors WHERE node = ?', (node,)).fetchone()
+        vendor = json.loads(body)
+        vendor['category_mask'] = mask
+        return vendor
+
+    def ids(self) -> Iterator[Tuple[int, str]]:
+        # In batches, so callers can update vendors between them
+        for start in range(0, self.count, self.LOOKUP_CHUNK * 20):
+            yield from self.db.execute('SELECT node, id FROM vendors WHERE node >= ? AND node < ? ORDER BY node',
+                                       (start, start + self.LOOKUP_CHUNK * 20)).fetchall()
+
+    def merge_domains(self, node: int, domains: List[str], resort: bool = False) -> Set[str]:
+        self.check_rss()
+        merged, body = self.db.execute('SELECT merged, body FROM vendors WHERE node = ?', (node,)).fetchone()
+        if not merged:
+            self.db.executemany('INSERT OR IGNORE INTO merged_domains VALUES (?, ?)',
+                                ((node, d) for d in json.loads(body)['domains']))
+        new = set(domains)
+        new -= {d for (d,) in self._lookup('SELECT domain FROM merged_domains WHERE node = ? AND domain IN ({})',
+                                           list(new), (node,))}
+        self.db.executemany('INSERT INTO merged_domains VALUES (?, ?)', ((node, d) for d in new))
+        self.db.execute('UPDATE vendors SET merged = ? WHERE node = ?', (2 if new or resort or merged == 2 else 1, node))
+        return new
+
+    def merge_categories(self, node: int, mask: int):
+        self.db.execute('UPDATE vendors SET category_mask = category_mask | ? WHERE node = ?', (mask, node))
+
+    def owners(self, domains: List[str]) -> Dict[str, int]:
+        return dict(self._lookup('SELECT domain, node FROM domains WHERE domain IN ({})', domains))
+
+    def _lookup(self, query: str, keys: List[str], params: tuple = ()) -> Iterator:
+        for i in range(0, len(keys), self.LOOKUP_CHUNK):
+            chunk = keys[i:i + self.LOOKUP_CHUNK]
+            yield from self.db.execute(query.format(','.join('?' * len(chunk))), params + tuple(chunk))
+
+    def claim(self, domains: Iterable[str], node: int):
+        self.db.executemany('INSERT OR REPLACE INTO domains VALUES (?, ?)', ((d, node) for d in domains))
+
+    def publish(self, node: int, vid: str):
+        if vid in self:
+            raise ValueError(f"vendor id {vid!r} is already published")
+        self.db.execute('UPDATE vendors SET output_id = ? WHERE node = ?', (vid, node))
+
+    def vendors(self) -> Iterator[Dict]:
+        # TEXT's default binary collation orders like Python's str comparison
+        for node, vid, merged, mask, body in self.db.execute(
+                'SELECT node, output_id, merged, category_mask, body FROM vendors '
+                'WHERE output_id IS NOT NULL ORDER BY output_id'):
+            vendor = json.loads(body)
+            vendor['id'] = vid
+            vendor['category_mask'] = mask
+            if merged == 2:
+                vendor['domains'] = [d for (d,) in self.db.execute(
+                    'SELECT domain FROM merged_domains WHERE node = ? ORDER BY domain', (node,))]
+            yield vendor
+
+
+class DisjointSet:
+    """Union-find over node numbers 0..n-1 (union by size, path halving)."""
+
+    def __init__(self):
+        self.parent = array('l')
+        self.size = array('l')
+
+    def add(self) -> int:
+        node = len(self.parent)
+        self.parent.append(node)
+        self.size.append(1)
+        return node
+
+    def find(self, node: int) -> int:
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, a: int, b: int) -> int:
+        """Join the sets of `a` and `b`, returning the new root."""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a
+
+
+@dataclass
+class VendorSource:
+    """
+    One vendor feed of the merge. Sources are merged in `priority` order
+    (lowest first); within a cluster of vendors sharing domains, the member
+    from the highest-priority source represents it.
+    """
+    file: str  # Vendor file in data/ (or its .jsonl sibling, if newer)
+    name: str  # Short name used in the cluster report
+    label: str = ''  # Display name (default: name)
+    priority: int = 0
+    tier: str = 'standard'  # Tier of vendors that don't set one
+    id_suffix: str = ''  # Appended to ids already taken (default: '-<name>')
+    curated: bool = False  # Always `tier`, never merged with each other; matching clusters are folded in
+    enrich_only: bool = False  # Only adds domains/categories to clusters represented by other sources
+
+    def __post_init__(self):
+        self.label = self.label or self.name
+        self.id_suffix = self.id_suffix or f'-{self.name}'
+
+
+# Priority: premium > duckduckgo > disconnect
+SOURCES = [
+    VendorSource('vendors.json', 'premium', 'Premium (existing)', priority=0, tier='premium', curated=True),
+    VendorSource('vendors-duckduckgo.json', 'duckduckgo', 'DuckDuckGo', priority=1, id_suffix='-ddg'),
+    VendorSource('vendors-disconnect.json', 'disconnect', 'Disconnect', priority=2, id_suffix='-dc'),
+]
+
+# Vendor file whose ids the Tracker Radar side artifacts (tracker_artifacts.py) refer to
+ARTIFACT_VENDOR_FILE = 'vendors-duckduckgo.json'
+
 
+def load_sources(path: Path) -> List[VendorSource]:
+    """Read a source list: a JSON array of VendorSource fields, e.g. {"file": ..., "name": ..., "priority": 3}."""
+    with open(path) as f:
+        return [VendorSource(**entry) for entry in json.load(f)]
+
+
+def index_vendors(sources: List[Tuple[VendorSource, Iterable[Dict]]], index: VendorIndex,
+                  report: Optional[Dict] = None) -> VendorIndex:
+    """
+    Deduplicate the vendors of all `sources` into `index`, reading each
+    record once.
+
+    Vendors sharing any domain are clustered with union-find, so a vendor
+    that bridges two others joins all three whatever the input order. A
+    cluster is represented by its member from the highest-priority source
+    (lowest id among equals), or folded into the curated vendor claiming its
+    domains. When a cluster touches several curated vendors, each member
+    goes to the curated vendor it shares the most domains with (highest
+    priority, then lowest id, on a tie) and members sharing none follow the
+    nearest member that does, so one bridging vendor can't pull the others'
+    domains into a single curated vendor. Curated vendors are never merged
+    with each other, and a cluster of enrich-only vendors matching nothing is
+    dropped. Members' domains and categories are merged into the
+    representative. With a `report` dict, the merged clusters, the vendors
+    that bridged existing clusters, the vendors matching several curated
+    vendors and, per source, the vendor ids that didn't survive as they were
+    (`id_map`: input id → output id, or None if dropped) are recorded in it.
+    """
+    sources = sorted(sources, key=lambda s: s[0].priority)
+    clusters = DisjointSet()
+    source_starts = []
+    curated_ids = {}  # Curated node → its vendor id
+    attach = {}  # Node → {curated node: number of domains they share}
+    adjacent = {}  # Non-curated node → non-curated nodes it shares a domain with
+    bridges = []
+    conflicts = []  # (node, curated node it went to, ids of the curated vendors it matched)
+
+    def rank_of(node: int) -> int:
+        return bisect.bisect_right(source_starts, node) - 1
+
+    def curated_key(node: int) -> Tuple[int, str]:
+        return rank_of(node), curated_ids[node]
+
+    for rank, (source, vendors) in enumerate(sources):
+        source_starts.append(len(index))
+        for v in vendors:
+            if source.curated:
+                v['tier'] = source.tier
+            else:
+                v.setdefault('tier', source.tier)
+            v = normalize_vendor(v)
+            node = index.add(v)
+            clusters.add()
+            owners = index.owners(v['domains'])
+
+            if source.curated:
+                # A domain listed by several curated vendors is claimed by the first by priority, then id
+                curated_ids[node] = v['id']
+                claimed = []
+                for d in v['domains']:
+                    owner = owners.get(d)
+                    if owner is None or (owner in curated_ids and curated_key(node) < curated_key(owner)):
+                        claimed.append(d)
+                    elif owner not in curated_ids:
+                        overlap = attach.setdefault(owner, {})
+                        overlap[node] = overlap.get(node, 0) + 1
+                index.claim(claimed, node)
+                continue
+
+            index.claim([d for d in v['domains'] if d not in owners], node)
+            neighbors = set()
+            for owner in owners.values():
+                if owner in curated_ids:
+                    overlap = attach.setdefault(node, {})
+                    overlap[owner] = overlap.get(owner, 0) + 1
+                else:
+                    neighbors.add(owner)
+            for neighbor in neighbors:
+                adjacent.setdefault(node, set()).add(neighbor)
+                adjacent.setdefault(neighbor, set()).add(node)
+            roots = {clusters.find(n) for n in neighbors}
+            if len(roots) > 1:
+                bridges.append((node, sorted(roots)))
+            for root in roots:
+                clusters.union(node, root)
+
+        if source.curated:
+            print(f"  Indexed {len(index) - source_starts[rank]} {source.name} vendors ({index.domain_count()} domains)")
+
+    def split_cluster(cluster: List[Tuple[int, str, int]]) -> Dict[int, int]:
+        """Curated vendor of each member of a cluster touching several of them."""
+        assigned = {}
+        queue = deque()
+        for _, _, node in cluster:
+            overlap = attach.get(node)
+            if overlap:
+                assigned[node] = min(overlap, key=lambda n: (-overlap[n], curated_key(n)))
+                queue.append(node)
+                if len(overlap) > 1:
+                    conflicts.append((node, assigned[node], sorted(curated_ids[n] for n in overlap)))
+        # The others follow the nearest attached member, breadth-first over shared domains
+        while queue:
+            node = queue.popleft()
+            for neighbor in sorted(adjacent.get(node, ())):
+                if neighbor not in assigned:
+                    assigned[neighbor] = assigned[node]
+                    queue.append(neighbor)
+        return assigned
+
+    # Members of every cluster that is merged, folded into a curated vendor or enrich-only, by (rank, id)
+    members = {}
+    for node, vid in index.ids():
+        if node in curated_ids:
+            continue
+        root = clusters.find(node)
+        rank = rank_of(node)
+        if clusters.size[root] > 1 or node in attach or sources[rank][0].enrich_only:
+            members.setdefault(root, []).append((rank, vid, node))
+    targets = {}  # Member node → the node it is published as or merged into (None: dropped)
+    groups = {}  # (cluster root, target) → members, for the report
+    merge_into = {}
+    for root, cluster in members.items():
+        cluster.sort()
+        matched_curated = set().union(*(attach[node] for _, _, node in cluster if node in attach))
+        if len(matched_curated) > 1:
+            assigned = split_cluster(cluster)
+        elif matched_curated:
+            assigned = dict.fromkeys((node for _, _, node in cluster), matched_curated.pop())
+        else:
+            leaders = [node for rank, _, node in cluster if not sources[rank][0].enrich_only]
+            assigned = dict.fromkeys((node for _, _, node in cluster), leaders[0] if leaders else None)
+        for member in cluster:
+            target = assigned[member[2]]
+            targets[member[2]] = target
+            groups.setdefault((root, target), []).append(member)
+            if target is not None and target != member[2]:
+                merge_into.setdefault(target, []).append(member)
+
+    # Publish curated vendors and cluster representatives; merge the other members in
+    added = [0] * len(sources)
+    merged = [0] * len(sources)
+    dropped = [0] * len(sources)
+    id_maps = [{} for _ in sources]  # Per source: renamed, merged or dropped id → output id
+    target_ids = {}  # Published id of each node other members are merged into
+    for node, vid in index.ids():
+        rank = rank_of(node)
+        source = sources[rank][0]
+        target = targets.get(node, node)
+        if target is None:
+            dropped[rank] += 1
+            id_maps[rank].setdefault(vid, None)
+            continue
+        if target != node:
+            merged[rank] += 1
+            continue
+        # Handle ID collisions: the source's suffix, then a counter
+        unique, count = vid, 1
+        while unique in index:
+            unique = vid + source.id_suffix + (f'-{count}' if count > 1 else '')
+            count += 1
+        index.publish(node, unique)
+        added[rank] += 1
+        if unique != vid:
+            id_maps[rank].setdefault(vid, unique)
+        if node in merge_into:
+            target_ids[node] = unique
+        for member_rank, _, member in sorted(merge_into.get(node, [])):
+            v = index.get(member)
+            # A vendor's sorted domain list stays sorted when a same-source vendor is merged in
+            index.merge_domains(node, v['domains'], resort=rank == member_rank and not source.curated)
+            index.merge_categories(node, v['category_mask'])
+    for target, group in merge_into.items():
+        for rank, vid, _ in group:
+            if target_ids[target] != vid:
+                id_maps[rank].setdefault(vid, target_ids[target])
+
+    # Unmatched enrich-only vendors aren't clusters
+    joined = sorted(((target, group) for (_, target), group in groups.items() if target is not None or len(group) > 1),
+                    key=lambda item: item[1][0])
+    for rank, (source, _) in enumerate(sources):
+        if not source.curated:
+            print(f"  Added {added[rank]} {source.label} vendors, merged {merged[rank]} into existing"
+                  + (f", dropped {dropped[rank]} without a match" if source.enrich_only else ""))
+    print(f"  {len(joined)} clusters merged, {len(bridges)} joined by a bridging vendor, "
+          f"{len(conflicts)} vendors matching several curated vendors")
+
+    if report is not None:
+        def describe(node: Optional[int]) -> Optional[Dict]:
+            return None if node is None else {'id': index.get(node)['id'], 'source': sources[rank_of(node)][0].name}
+
+        report['clusters'] = [
+            {'into': describe(target),
+             'members': [{'id': vid, 'source': sources[rank][0].name} for rank, vid, _ in group]}
+            for target, group in joined
+        ]
+        report['bridges'] = [{'via': describe(node), 'joined': [describe(root) for root in roots]}
+                             for node, roots in bridges]
+        report['curated_conflicts'] = [{'via': describe(node), 'into': curated_ids[target], 'matched': matched}
+                                       for node, target, matched in sorted(conflicts)]
+        report['id_map'] = {source.name: id_map for (source, _), id_map in zip(sources, id_maps)}
+    return index
+
+
+def finalize_vendors(index: VendorIndex) -> Iterator[Dict]:
+    """Yield the merged vendors in id order, ready for output."""
     # Clean up: remove import-specific fields from final output
     cleanup_fields = ['source', 'prevalence', 'fingerprinting', 'cookies',
-                      'sites', 'disconnect_category', 'website']
-    result = []
-    for v in vendors_by_id.values():
+                      'sites', 'ddg_categories', 'countries', 'country_prevalence', 'country_sites',
+                      'disconnect_category', 'website']
+    for v in index.vendors():
         # Keep import metadata in a nested object for reference
         metadata = {}
         for field in cleanup_fields:
@@ -216,104 +568,167 @@ def merge_vendors(premium: List[Dict], duckduckgo: List[Dict], disconnect: List[
                 metadata[field] = v.pop(field)
         if metadata:
             v['_import_metadata'] = metadata
-        result.append(v)
+        yield v
 
-    # Sort by ID for deterministic output
-    result.sort(key=lambda v: v['id'])
 
-    return result
+def merge_vendors(sources: List[Tuple[VendorSource, List[Dict]]], report: Optional[Dict] = None) -> List[Dict]:
+    """
+    Merge the vendor lists of all sources with intelligent deduplication,
+    by source priority. Uses domain overlap for deduplication (see index_vendors()).
+    """
+    return list(finalize_vendors(index_vendors(sources, VendorIndex(), report)))
+
+
+def save_vendor_db(path: Path, vendor_db: Dict):
+    """
+    Write the VendorDatabase exactly as json.dump(vendor_db, indent=4) would,
+    but consume vendor_db['vendors'] (any iterable) one vendor at a time.
+    """
+    with open(path, 'w') as f:
+        f.write('{')
+        for i, (key, value) in enumerate(vendor_db.items()):
+            f.write((',' if i else '') + '\n    ' + json.dumps(key) + ': ')
+            if key != 'vendors':
+                f.write(json.dumps(value, indent=4).replace('\n', '\n    '))
+                continue
+            count = 0
+            for vendor in value:
+                f.write((',' if count else '[') + '\n        ' + json.dumps(vendor, indent=4).replace('\n', '\n        '))
+                count += 1
+            f.write('\n    ]' if count else '[]')
+        f.write('\n}')
+
+
+def tally_vendors(vendors: Iterable[Dict], stats: Dict) -> Iterator[Dict]:
+    """Pass vendors through while counting them into `stats` for the summary."""
+    for v in vendors:
+        stats['total'] += 1
+        tier = v.get('tier', 'standard')
+        stats['by_tier'][tier] = stats['by_tier'].get(tier, 0) + 1
+        stats['total_domains'] += len(v.get('domains', []))
+        cat = v.get('category', 'other')
+        stats['categories'][cat] = stats['categories'].get(cat, 0) + 1
+        score = v.get('risk_score', 5)
+        if score >= 8:
+            stats['risk_dist']['critical (8-10)'] += 1
+        elif score >= 6:
+            stats['risk_dist']['high (6-7)'] += 1
+        elif score >= 4:
+            stats['risk_dist']['medium (4-5)'] += 1
+        else:
+            stats['risk_dist']['low (1-3)'] += 1
+        yield v
+
+
+def save_merged_vendors(path: Path, vendors: Iterable[Dict], categories: List[Dict], stats: Dict):
+    """Build the final VendorDatabase around `vendors` and save it, counting them into `stats`."""
+    now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    vendor_db = {
+        'version': '3.0.0',
+        'last_updated': now,
+        'vendors': tally_vendors(vendors, stats),
+        'categories': categories,
+    }
+    save_vendor_db(path, vendor_db)
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Merge all vendor databases into vendors.json.')
+    parser.add_argument('--low-memory', action='store_true',
+                        help='keep the dedup and domain index in an on-disk SQLite store and '
+                             'load one source at a time')
+    parser.add_argument('--max-rss-mb', type=int, metavar='MB',
+                        help='memory cap for --low-memory (sizes the SQLite cache, '
+                             'stops the merge if peak RSS exceeds it; implies --low-memory)')
+    parser.add_argument('--sources', type=Path, metavar='JSON',
+                        help='merge the sources listed in this file (a JSON array of {"file", "name", '
+                             '"label", "priority", "tier", "id_suffix", "curated", "enrich_only"}) '
+                             'instead of premium, DuckDuckGo and Disconnect')
+    args = parser.parse_args()
+    low_memory = args.low_memory or args.max_rss_mb is not None
+    try:
+        sources = load_sources(args.sources) if args.sources else SOURCES
+    except (OSError, ValueError, TypeError) as e:
+        parser.error(f"--sources: {e}")
+
     print("🔀 Merging All Vendor Databases")
     print("=" * 60)
 
     data_dir = Path(__file__).parent.parent / 'data'
 
-    # Load all databases
-    print("\n📦 Loading databases...")
-    premium = load_vendors('vendors.json', data_dir)
-    duckduckgo = load_vendors('vendors-duckduckgo.json', data_dir)
-    disconnect = load_vendors('vendors-disconnect.json', data_dir)
-
-    print(f"  Premium (existing): {len(premium)} vendors")
-    print(f"  DuckDuckGo: {len(duckduckgo)} vendors")
-    print(f"  Disconnect: {len(disconnect)} vendors")
-
     # Backup existing vendors.json
     backup_path = data_dir / 'vendors-backup.json'
     original_path = data_dir / 'vendors.json'
-    if original_path.exists():
-        shutil.copy(original_path, backup_path)
-        print(f"\n💾 Backed up existing to: {backup_path}")
-
-    # Merge
-    print("\n🔄 Merging...")
-    merged = merge_vendors(premium, duckduckgo, disconnect)
-
-    # Count by tier
-    by_tier = {'premium': 0, 'standard': 0, 'basic': 0}
-    for v in merged:
-        tier = v.get('tier', 'standard')
-        by_tier[tier] = by_tier.get(tier, 0) + 1
 
-    total_domains = sum(len(v.get('domains', [])) for v in merged)
+    # Load existing categories and add new ones
+    existing_categories = load_categories(data_dir)
+    existing_cat_ids = {c['id'] for c in existing_categories}
+    new_categories = [c for c in NEW_CATEGORIES if c['id'] not in existing_cat_ids]
+    existing_categories.extend(new_categories)
+
+    # Vendors are counted as they are written
+    stats = {
+        'total': 0,
+        'by_tier': {'premium': 0, 'standard': 0, 'basic': 0},
+        'total_domains': 0,
+        'categories': {},
+        'risk_dist': {'critical (8-10)': 0, 'high (6-7)': 0, 'medium (4-5)': 0, 'low (1-3)': 0},
+    }
+    output_path = data_dir / 'vendors.json'
+    report = {}
+    if low_memory:
+        # Sources are streamed, one at a time, as the merge reaches them
+        backed_up = original_path.exists()
+        if backed_up:
+            shutil.copy(original_path, backup_path)
+            print(f"\n💾 Backed up existing to: {backup_path}")
+        try:
+            with SqliteVendorIndex(args.max_rss_mb) as index:
+                print(f"\n🔄 Merging (low-memory, index in {index.path})...")
+                index_vendors([(source, iter_vendors(source.file, data_dir, source.label)) for source in sources],
+                              index, report)
+                save_merged_vendors(output_path, finalize_vendors(index), existing_categories, stats)
+        except RssCapExceeded as e:
+            # vendors.json may be half written: put the previous one back
+            if backed_up:
+                shutil.copy(backup_path, original_path)
+            elif output_path.exists():
+                output_path.unlink()
+            print(f"\n❌ {e}")
+            sys.exit(1)
+    else:
+        # Load all databases
+        print("\n📦 Loading databases...")
+        loaded = [(source, load_vendors(source.file, data_dir)) for source in sources]
+        for source, vendors in loaded:
+            print(f"  {source.label}: {len(vendors)} vendors")
 
-    # Category counts
-    categories = {}
-    for v in merged:
-        cat = v.get('category', 'other')
-        categories[cat] = categories.get(cat, 0) + 1
+        if original_path.exists():
+            shutil.copy(original_path, backup_path)
+            print(f"\n💾 Backed up existing to: {backup_path}")
 
-    # Risk distribution
-    risk_dist = {'critical (8-10)': 0, 'high (6-7)': 0, 'medium (4-5)': 0, 'low (1-3)': 0}
-    for v in merged:
-        score = v.get('risk_score', 5)
-        if score >= 8:
-            risk_dist['critical (8-10)'] += 1
-        elif score >= 6:
-            risk_dist['high (6-7)'] += 1
-        elif score >= 4:
-            risk_dist['medium (4-5)'] += 1
-        else:
-            risk_dist['low (1-3)'] += 1
+        # Merge
+        print("\n🔄 Merging...")
+        save_merged_vendors(output_path, merge_vendors(loaded, report), existing_categories, stats)
 
+    categories = stats['categories']
     print(f"\n📊 Final Statistics:")
-    print(f"   Total vendors: {len(merged)}")
-    print(f"   Premium (curated): {by_tier['premium']}")
-    print(f"   Standard (auto): {by_tier['standard']}")
-    print(f"   Total domains: {total_domains}")
+    print(f"   Total vendors: {stats['total']}")
+    print(f"   Premium (curated): {stats['by_tier']['premium']}")
+    print(f"   Standard (auto): {stats['by_tier']['standard']}")
+    print(f"   Total domains: {stats['total_domains']}")
     print(f"   Categories: {len(categories)}")
 
     print(f"\n   Risk Distribution:")
-    for k, v in risk_dist.items():
+    for k, v in stats['risk_dist'].items():
         print(f"     {k}: {v}")
 
     print(f"\n   Top 15 categories:")
     for cat, count in sorted(categories.items(), key=lambda x: -x[1])[:15]:
         print(f"     {cat}: {count}")
 
-    # Load existing categories and add new ones
-    existing_categories = load_categories(data_dir)
-    existing_cat_ids = {c['id'] for c in existing_categories}
-    for new_cat in NEW_CATEGORIES:
-        if new_cat['id'] not in existing_cat_ids:
-            existing_categories.append(new_cat)
-            print(f"\n   Added new category: {new_cat['id']}")
-
-    # Build final VendorDatabase
-    now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
-    vendor_db = {
-        'version': '3.0.0',
-        'last_updated': now,
-        'vendors': merged,
-        'categories': existing_categories,
-    }
-
-    # Save merged database
-    output_path = data_dir / 'vendors.json'
-    with open(output_path, 'w') as f:
-        json.dump(vendor_db, f, indent=4)
+    for new_cat in new_categories:
+        print(f"\n   Added new category: {new_cat['id']}")
 
     # Also copy to packages/core/data/
     core_path = data_dir.parent / 'packages' / 'core' / 'data' / 'vendors.json'
@@ -322,9 +737,21 @@ def main():
         print(f"\n   Copied to: {core_path}")
 
     print(f"\n💾 Saved merged database to: {output_path}")
+
+    report_path = data_dir / 'merge-report.json'
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"   Cluster report: {report_path}")
+    # Point the side artifacts' vendor ids at the merged vendors
+    for source in sources:
+        if source.file == ARTIFACT_VENDOR_FILE:
+            for path in remap_saved_artifacts(report['id_map'][source.name], data_dir):
+                print(f"   Remapped vendor ids in: {path}")
+    if low_memory:
+        report_peak_rss(args.max_rss_mb)
     print(f"\n✅ Merge complete!")
-    print(f"   {len(merged)} total vendors")
-    print(f"   {total_domains} total domains")
+    print(f"   {stats['total']} total vendors")
+    print(f"   {stats['total_domains']} total domains")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,76 @@
+"""
+Scratch SQLite store shared by the importers' --low-memory modes.
+
+Dedup state lives in a throwaway on-disk database instead of Python dicts,
+so peak memory stays flat no matter how large the sources get. With a
+--max-rss-mb cap, the stores stop the run (RssCapExceeded) once the
+process goes over it.
+"""
+
+import os
+import resource
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+
+# Share of --max-rss-mb handed to SQLite's page cache
+CACHE_SHARE = 0.25
+
+
+class RssCapExceeded(Exception):
+    """Peak RSS went over the --max-rss-mb cap."""
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process so far, in MB. Worker processes
+    aren't counted, so the cap only holds for serial runs.
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, KiB elsewhere
+    return rss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def report_peak_rss(max_rss_mb: Optional[int] = None):
+    """Print the peak RSS, warning when it went over the configured cap."""
+    peak = peak_rss_mb()
+    if max_rss_mb and peak > max_rss_mb:
+        print(f"   ⚠️  Peak RSS {peak:.0f} MB exceeded the {max_rss_mb} MB cap")
+    else:
+        print(f"   Peak RSS: {peak:.0f} MB" + (f" (cap {max_rss_mb} MB)" if max_rss_mb else ""))
+
+
+class SqliteStore:
+    """
+    Temporary SQLite database, deleted on close. Durability is switched off:
+    the data is rebuilt from the sources on every run anyway.
+    """
+
+    def __init__(self, max_rss_mb: Optional[int] = None, directory: Optional[Path] = None):
+        self.max_rss_mb = max_rss_mb
+        fd, self.path = tempfile.mkstemp(prefix='etalon-', suffix='.sqlite', dir=directory)
+        os.close(fd)
+        self.db = sqlite3.connect(self.path)
+        cache_kib = int(max_rss_mb * 1024 * CACHE_SHARE) if max_rss_mb else 64 * 1024
+        self.db.execute('PRAGMA journal_mode = OFF')
+        self.db.execute('PRAGMA synchronous = OFF')
+        self.db.execute('PRAGMA temp_store = FILE')
+        self.db.execute(f'PRAGMA cache_size = -{cache_kib}')
+
+    def check_rss(self):
+        """Raise RssCapExceeded once peak RSS has gone over the --max-rss-mb cap."""
+        if self.max_rss_mb and peak_rss_mb() > self.max_rss_mb:
+            raise RssCapExceeded(f"Peak RSS {peak_rss_mb():.0f} MB exceeded the {self.max_rss_mb} MB cap")
+
+    def close(self):
+        self.db.close()
+        os.unlink(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,245 @@
+"""
+Tests for import-duckduckgo.py: python -m unittest discover scripts/tests
+
+Each import mode is compared with a serial full import of the same small
+generated Tracker Radar domains folder.
+"""
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+SCRIPTS = Path(__file__).parent.parent
+sys.path.insert(0, str(SCRIPTS))
+spec = importlib.util.spec_from_file_location('import_duckduckgo', SCRIPTS / 'import-duckduckgo.py')
+ddg = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = ddg  # Worker processes look the parse functions up by module name
+spec.loader.exec_module(ddg)
+
+from sqlite_store import RssCapExceeded  # noqa: E402
+from vendor_jsonl import VendorArrayWriter  # noqa: E402
+
+COUNTRIES = ['DE', 'GB', 'US']
+OWNERS = [f'Owner {i}' for i in range(12)]
+
+
+def write_domains(root: Path, count: int = 200):
+    """A Tracker Radar domains folder: `count` domains, each in some of the countries."""
+    rng = random.Random(7)
+    domains = [f'tracker{i}.com' for i in range(count)]
+    for country in COUNTRIES:
+        (root / country).mkdir(parents=True)
+        for domain in domains:
+            if rng.random() < 0.3:
+                continue
+            owner = rng.choice(OWNERS)
+            record = {
+                'domain': domain,
+                'owner': {'name': owner, 'displayName': owner},
+                'categories': rng.sample(['Advertising', 'Analytics', 'Session Replay', 'CDN'], rng.randint(0, 2)),
+                'subdomains': rng.sample(['cdn', 'px', 'www'], rng.randint(0, 2)),
+                'prevalence': round(rng.random() * 0.1, 4),
+                'fingerprinting': rng.randint(0, 3),
+                'sites': rng.randint(0, 5000),
+                'resources': [{'rule': domain.replace('.', '\\.') + f'\\/p{k}\\/.*', 'type': 'Script',
+                               'cookies': round(rng.random(), 2), 'fingerprinting': rng.randint(0, 3),
+                               'prevalence': round(rng.random() * 0.1, 4), 'sites': rng.randint(0, 99)}
+                              for k in range(rng.randint(0, 2))],
+                'cnames': [{'original': f'metrics.site{rng.randint(0, 20)}.com', 'resolved': f'edge.{domain}'}
+                           for _ in range(rng.randint(0, 1))],
+                'topInitiators': [{'domain': rng.choice(domains[:20]), 'prevalence': 0.1}
+                                  for _ in range(rng.randint(0, 2))],
+            }
+            (root / country / f'{domain}.json').write_text(json.dumps(record))
+    (root / 'US' / 'broken.com.json').write_text('{not json')
+
+
+def quiet(function, *args, **kwargs):
+    """Call `function` without its progress output."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+
+class ImportTestCase(unittest.TestCase):
+    """Runs imports in a scratch repo: data/ (manifest, checkpoint, reports) lives in a temp dir."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fixture = Path(tempfile.mkdtemp(prefix='ddg-test-'))
+        write_domains(cls.fixture / 'domains')
+        cls.files = len(list((cls.fixture / 'domains').rglob('*.json')))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.fixture)
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp(prefix='ddg-root-'))
+        self.addCleanup(shutil.rmtree, self.root)
+        (self.root / 'scripts').mkdir()
+        file = ddg.__file__
+        ddg.__file__ = str(self.root / 'scripts' / 'import-duckduckgo.py')
+        self.addCleanup(setattr, ddg, '__file__', file)
+        self.source = self.fixture / 'domains'
+
+    def run_import(self, **options):
+        """Import self.source quietly; returns (vendors, artifacts, parse report)."""
+        artifacts, report = {}, {}
+        options.setdefault('checkpoint_every', 0)
+        vendors = quiet(ddg.import_duckduckgo_tracker_radar, source=self.source, artifacts=artifacts,
+                        report=report, **options)
+        return vendors, artifacts, report
+
+    def serial(self, consolidate: bool = False):
+        vendors, artifacts, _ = self.run_import(full=True, consolidate=consolidate)
+        self.assertTrue(vendors)
+        return vendors, artifacts
+
+
+class ParallelParseTest(ImportTestCase):
+    def test_workers_match_serial(self):
+        vendors, artifacts, report = self.run_import(full=True, workers=2)
+        self.assertEqual((vendors, artifacts), self.serial())
+
+        # Every file parsed in a worker is counted against that worker
+        workers = report['per_worker']
+        self.assertTrue(workers)
+        self.assertNotIn(os.getpid(), [w['pid'] for w in workers])
+        self.assertEqual(sum(w['parsed'] for w in workers), report['parsed'])
+        self.assertEqual(sum(w['parsed'] + w['skipped'] + w['unchanged'] for w in workers), report['files'])
+
+
+class IncrementalManifestTest(ImportTestCase):
+    def test_rerun_serves_unchanged_files_from_manifest(self):
+        self.source = self.root / 'domains'
+        shutil.copytree(self.fixture / 'domains', self.source)
+        first = self.run_import()
+        self.assertEqual(first[:2], self.serial())
+
+        vendors, artifacts, report = self.run_import()
+        self.assertEqual((vendors, artifacts), self.serial())
+        self.assertEqual(report['parsed'], 0)
+        self.assertEqual(report['unchanged'], report['files'])
+
+        # Only the edited file is parsed again
+        path = sorted((self.source / 'US').glob('tracker*.json'))[0]
+        record = json.loads(path.read_text())
+        record['categories'] = ['Session Replay']
+        path.write_text(json.dumps(record))
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+        vendors, artifacts, report = self.run_import()
+        self.assertEqual((report['parsed'], report['unchanged']), (1, report['files'] - 1))
+        self.assertEqual((vendors, artifacts), self.serial())
+
+    def test_main_rejects_bad_prefetch_and_checkpoint_values(self):
+        for flags in (['--prefetch-depth', '0'], ['--checkpoint-every', '-1']):
+            with mock.patch.object(sys, 'argv', ['import-duckduckgo.py'] + flags), \
+                    contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit) as exit:
+                ddg.main()
+            self.assertEqual(exit.exception.code, 2)
+
+
+class CheckpointResumeTest(ImportTestCase):
+    def test_interrupted_import_resumes_to_serial_output(self):
+        parse_jobs = ddg.parse_jobs
+
+        def interrupted(*args, **kwargs):
+            for n, item in enumerate(parse_jobs(*args, **kwargs)):
+                if n == 150:
+                    raise KeyboardInterrupt
+                yield item
+
+        with mock.patch.object(ddg, 'parse_jobs', interrupted), self.assertRaises(KeyboardInterrupt):
+            self.run_import(full=True, checkpoint_every=20)
+
+        vendors, artifacts, report = self.run_import(full=True, checkpoint_every=20, resume=True)
+        self.assertEqual(report['resumed'], 140)
+        self.assertEqual(report['files'], self.files - 140)
+        self.assertEqual((vendors, artifacts), self.serial())
+
+    def test_duplicate_archive_members_are_read_once(self):
+        archive = self.root / 'tracker-radar.zip'
+        with zipfile.ZipFile(archive, 'w') as zf:
+            for path in sorted(self.source.rglob('*.json')):
+                key = path.relative_to(self.source).as_posix()
+                zf.write(path, key)
+                zf.write(path, f'tracker-radar/domains/{key}')
+        self.source = archive
+        vendors, artifacts, report = self.run_import(full=True)
+        self.assertEqual(report['files'], self.files)
+        self.assertEqual(report['unchanged'], 0)
+        self.assertEqual((vendors, artifacts), self.serial())
+
+
+
+class ShardReduceTest(ImportTestCase):
+    def shards(self, count: int, low_memory: bool = False):
+        paths = []
+        for i in range(1, count + 1):
+            if low_memory:
+                with ddg.DomainCopyStore() as store:
+                    paths.append(quiet(ddg.import_duckduckgo_shard, (i, count), source=self.source, full=True,
+                                       checkpoint_every=0, store=store))
+            else:
+                paths.append(quiet(ddg.import_duckduckgo_shard, (i, count), source=self.source, full=True,
+                                   checkpoint_every=0))
+        return paths
+
+    def test_reduce_matches_serial(self):
+        paths = self.shards(3)
+        for consolidate in (False, True):
+            artifacts = {}
+            vendors = quiet(ddg.reduce_duckduckgo_shards, paths, artifacts, consolidate=consolidate)
+            self.assertEqual((vendors, artifacts), self.serial(consolidate))
+
+    def test_low_memory_shards_and_reduce_match_serial(self):
+        paths = self.shards(2, low_memory=True)
+        artifacts = {}
+        with ddg.DomainCopyStore() as store:
+            vendors = quiet(ddg.reduce_duckduckgo_shards, paths, artifacts, store=store)
+        self.assertEqual((vendors, artifacts), self.serial())
+
+    def test_partial_reduce_is_refused(self):
+        paths = self.shards(3)
+        self.assertEqual(quiet(ddg.reduce_duckduckgo_shards, paths[:2]), [])
+
+        # Allowed, it holds the vendors of the shards it got: those whose
+        # tracker domain (the shortest, the others are subdomains) is in them
+        vendors = quiet(ddg.reduce_duckduckgo_shards, paths[:2], allow_partial=True)
+        expected = [v for v in self.serial()[0] if ddg.shard_of(min(v['domains'], key=len), 3) < 2]
+        self.assertEqual(vendors, expected)
+
+
+class LowMemoryTest(ImportTestCase):
+    def test_low_memory_matches_serial(self):
+        for consolidate in (False, True):
+            vendors, artifacts, _ = self.run_import(low_memory=True, consolidate=consolidate)
+            self.assertEqual((vendors, artifacts), self.serial(consolidate))
+
+    def test_streamed_vendor_file_matches_serial(self):
+        path = self.root / 'vendors-duckduckgo.json'
+        writer = VendorArrayWriter(path)
+        vendors, artifacts, _ = self.run_import(low_memory=True, consolidate=True, writer=writer)
+        writer.close()
+        self.assertEqual(vendors, [])  # Written, not returned
+        expected, expected_artifacts = self.serial(consolidate=True)
+        self.assertEqual(path.read_text(), json.dumps(expected, indent=2))
+        self.assertEqual(artifacts, expected_artifacts)
+
+    def test_rss_cap_stops_the_import(self):
+        with self.assertRaises(RssCapExceeded):
+            self.run_import(low_memory=True, max_rss_mb=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+Tests for merge-all-vendors.py: python -m unittest discover scripts/tests
+"""
+
+import importlib.util
+import sys
+import unittest
+from pathlib import Path
+
+SCRIPTS = Path(__file__).parent.parent
+sys.path.insert(0, str(SCRIPTS))
+spec = importlib.util.spec_from_file_location('merge_all_vendors', SCRIPTS / 'merge-all-vendors.py')
+merge = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(merge)
+
+import tracker_artifacts  # noqa: E402
+
+
+def vendor(vid, *domains, category='advertising'):
+    return {'id': vid, 'name': vid, 'company': vid, 'category': category, 'domains': list(domains)}
+
+
+def sources():
+    """
+    Curated Google and Microsoft vendors, with DuckDuckGo per-domain vendors
+    matching each of them and Disconnect company vendors bridging those.
+    """
+    premium = [
+        vendor('doubleclick', 'doubleclick.net', 'googlesyndication.com'),
+        vendor('google-analytics', 'google-analytics.com', 'analytics.google.com', category='analytics'),
+        vendor('linkedin-insight', 'px.ads.linkedin.com', 'snap.licdn.com'),
+        vendor('microsoft-ads', 'bat.bing.com'),
+    ]
+    duckduckgo = [
+        vendor('doubleclick-net', 'doubleclick.net', 'ad.doubleclick.net', 'stats.g.doubleclick.net'),
+        vendor('google-analytics-com', 'google-analytics.com', 'ssl.google-analytics.com', 'stats.g.doubleclick.net'),
+        vendor('googletagmanager-com', 'googletagmanager.com', 'ssl.google-analytics.com'),
+        vendor('bing-com', 'bing.com', 'bat.bing.com', 'c.bing.com'),
+        vendor('linkedin-com', 'linkedin.com', 'snap.licdn.com', 'licdn.com'),
+    ]
+    disconnect = [
+        vendor('google', 'doubleclick.net', 'google-analytics.com', 'gstatic.com'),
+        vendor('microsoft', 'bing.com', 'linkedin.com', 'clarity.ms'),
+    ]
+    return [(merge.SOURCES[0], premium), (merge.SOURCES[1], duckduckgo), (merge.SOURCES[2], disconnect)]
+
+
+class CuratedFoldTest(unittest.TestCase):
+    def merged(self, index):
+        report = {}
+        merge.index_vendors(sources(), index, report)
+        return {v['id']: v for v in index.vendors()}, report
+
+    def check(self, index):
+        vendors, report = self.merged(index)
+        self.assertEqual(sorted(vendors), ['doubleclick', 'google-analytics', 'linkedin-insight', 'microsoft-ads'])
+
+        # Each curated vendor keeps its own domains and those of the vendors matching it
+        self.assertEqual(vendors['google-analytics']['domains'], [
+            'analytics.google.com', 'google-analytics.com', 'googletagmanager.com', 'ssl.google-analytics.com',
+            'stats.g.doubleclick.net'])
+        self.assertIn('ad.doubleclick.net', vendors['doubleclick']['domains'])
+        self.assertNotIn('ssl.google-analytics.com', vendors['doubleclick']['domains'])
+        self.assertEqual(vendors['microsoft-ads']['domains'][:3], ['bat.bing.com', 'bing.com', 'c.bing.com'])
+        self.assertIn('licdn.com', vendors['linkedin-insight']['domains'])
+        self.assertNotIn('bing.com', vendors['linkedin-insight']['domains'])
+
+        # Only the vendors sharing domains with two curated vendors are conflicts
+        self.assertEqual([c['via']['id'] for c in report['curated_conflicts']], ['google'])
+        self.assertEqual(report['curated_conflicts'][0]['matched'], ['doubleclick', 'google-analytics'])
+
+        # Every folded vendor id maps to the curated vendor it went to
+        self.assertEqual(report['id_map'], {
+            'premium': {},
+            'duckduckgo': {'doubleclick-net': 'doubleclick', 'google-analytics-com': 'google-analytics',
+                           'googletagmanager-com': 'google-analytics', 'bing-com': 'microsoft-ads',
+                           'linkedin-com': 'linkedin-insight'},
+            'disconnect': {'google': 'doubleclick', 'microsoft': 'microsoft-ads'},
+        })
+
+    def test_in_memory(self):
+        self.check(merge.VendorIndex())
+
+    def test_sqlite(self):
+        index = merge.SqliteVendorIndex()
+        try:
+            self.check(index)
+        finally:
+            index.close()
+
+
+class IdCollisionTest(unittest.TestCase):
+    def test_taken_ids_get_a_suffix(self):
+        first = merge.VendorSource('a.json', 'first')
+        second = merge.VendorSource('b.json', 'second', priority=1)
+        self.assertEqual(second.id_suffix, '-second')
+        index = merge.index_vendors([
+            (first, [vendor('tracker', 'a.com')]),
+            (second, [vendor('tracker', 'b.com'), vendor('tracker', 'c.com'), vendor('tracker', 'd.com')]),
+        ], merge.VendorIndex())
+        vendors = {v['id']: v['domains'] for v in index.vendors()}
+        self.assertEqual(vendors, {'tracker': ['a.com'], 'tracker-second': ['b.com'],
+                                   'tracker-second-2': ['c.com'], 'tracker-second-3': ['d.com']})
+
+    def test_renamed_id_is_reported(self):
+        report = {}
+        merge.index_vendors([
+            (merge.VendorSource('a.json', 'first'), [vendor('tracker', 'a.com')]),
+            (merge.VendorSource('b.json', 'second', priority=1), [vendor('tracker', 'b.com')]),
+        ], merge.VendorIndex(), report)
+        self.assertEqual(report['id_map'], {'first': {}, 'second': {'tracker': 'tracker-second'}})
+
+    def test_publish_refuses_taken_id(self):
+        index = merge.VendorIndex()
+        index.publish(index.add(vendor('tracker', 'a.com')), 'tracker')
+        with self.assertRaises(ValueError):
+            index.publish(index.add(vendor('tracker', 'b.com')), 'tracker')
+
+
+class ArtifactRemapTest(unittest.TestCase):
+    def test_remap_starts_from_importer_ids(self):
+        artifact = tracker_artifacts.build_cname_index([
+            ('doubleclick-net', 'doubleclick.net', ('ads.example.com', 'ad.doubleclick.net')),
+            ('bing-com', 'bing.com', ('bat.example.com', 'bat.bing.com')),
+        ])
+        tracker_artifacts.remap_vendor_ids(artifact, {'doubleclick-net': 'doubleclick'})
+        self.assertEqual(tracker_artifacts.lookup_cname_target(artifact, 'ad.doubleclick.net'), 'doubleclick')
+        self.assertEqual(tracker_artifacts.lookup_cname_target(artifact, 'bat.bing.com'), 'bing-com')
+
+        # A later merge remaps the importer's ids, not the previous merge's
+        tracker_artifacts.remap_vendor_ids(artifact, {'doubleclick-net': 'google', 'bing-com': 'microsoft'})
+        self.assertEqual(artifact['source_vendors'], ['bing-com', 'doubleclick-net'])
+        self.assertEqual(artifact['vendors'], ['microsoft', 'google'])
+
+
+if __name__ == '__main__':
+    unittest.main()
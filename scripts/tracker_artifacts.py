@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Side artifacts compiled from Tracker Radar by import-duckduckgo.py, and
+their query APIs:
+  cname-index-duckduckgo.json      CNAME target → vendor (lookup_cname_target())
+  resource-rules-duckduckgo.json   request URL → tracking resource rule (ResourceMatcher)
+  initiator-graph-duckduckgo.json  loader → loaded domains (InitiatorGraph)
+
+The vendor tables hold DuckDuckGo vendor ids until merge-all-vendors.py
+points them at the merged ids (remap_saved_artifacts()).
+
+Run directly to query them, e.g.
+    python scripts/tracker_artifacts.py --match-url https://www.google-analytics.com/analytics.js
+"""
+
+import argparse
+import bisect
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+
+def build_cname_index(entries: Iterable[Tuple[str, str, str]], presorted: bool = False) -> Dict:
+    """
+    Build a compact CNAME index from (vendor id, tracker domain, [alias, target])
+    entries: sorted host arrays with parallel indexes into a vendor id table,
+    for binary search. `targets` holds every resolved CNAME target plus the
+    tracker's own domain (for suffix lookups); `aliases` holds the first-party
+    hostnames seen cloaking each tracker.
+    With `presorted`, entries are streamed as given and must already be sorted.
+    """
+    targets, aliases = {}, {}
+    for vendor_id, domain, (alias, target) in entries if presorted else sorted(entries):
+        targets.setdefault(domain, vendor_id)
+        targets.setdefault(target, vendor_id)
+        aliases.setdefault(alias, vendor_id)
+
+    vendor_ids = sorted(set(targets.values()) | set(aliases.values()))
+    vendor_idx = {vid: i for i, vid in enumerate(vendor_ids)}
+    target_hosts = sorted(targets)
+    alias_hosts = sorted(aliases)
+    return {
+        'version': 1,
+        'source': 'duckduckgo-tracker-radar',
+        'vendors': vendor_ids,
+        'targets': target_hosts,
+        'target_vendor': [vendor_idx[targets[h]] for h in target_hosts],
+        'aliases': alias_hosts,
+        'alias_vendor': [vendor_idx[aliases[h]] for h in alias_hosts],
+    }
+
+
+def lookup_cname_target(index: Dict, host: str) -> Optional[str]:
+    """Return the vendor id a CNAME target belongs to, matching on the host or any parent domain."""
+    labels = host.lower().rstrip('.').split('.')
+    hosts = index['targets']
+    for i in range(len(labels) - 1):
+        candidate = '.'.join(labels[i:])
+        pos = bisect.bisect_left(hosts, candidate)
+        if pos < len(hosts) and hosts[pos] == candidate:
+            return index['vendors'][index['target_vendor'][pos]]
+    return None
+
+
+RESOURCE_RULE_COLUMNS = ['path_prefix', 'rule', 'vendor', 'type', 'cookies', 'fingerprinting', 'prevalence', 'sites']
+
+
+def rule_literal_prefix(rule: str) -> Optional[str]:
+    """
+    Literal text every match of a resource rule starts with, e.g.
+    'doubleclick\\.net\\/pagead\\/.*' → 'doubleclick.net/pagead/'.
+    Returns None for rules with alternation, which have no common prefix.
+    """
+    if '|' in rule:
+        return None
+    out = []
+    i = 0
+    while i < len(rule):
+        c = rule[i]
+        if c == '\\':
+            if i + 1 < len(rule) and not rule[i + 1].isalnum():
+                out.append(rule[i + 1])
+                i += 2
+                continue
+            break  # Character class such as \d or \w
+        if c in '.^$*+?{}[]()':
+            break
+        out.append(c)
+        i += 1
+    # A quantifier right after the literal makes its last character optional
+    if i < len(rule) and rule[i] in '*?{' and out:
+        out.pop()
+    return ''.join(out)
+
+
+def split_rule_prefix(rule: str) -> Tuple[str, str]:
+    """
+    Split a rule into (host, path prefix) for indexing. Rules whose host
+    isn't fully literal go to the catch-all host '' and are always tested.
+    """
+    literal = rule_literal_prefix(rule)
+    if literal is None:
+        return '', ''
+    if '/' in literal:
+        slash = literal.index('/')
+        return literal[:slash], literal[slash:]
+    if literal == rule.replace('\\', ''):
+        return literal, ''  # The whole rule is a plain host
+    return '', ''
+
+
+def build_resource_matcher(entries: Iterable[Tuple[str, List]], presorted: bool = False) -> Dict:
+    """
+    Deduplicate (vendor id, resource row) entries by rule and compile them into
+    a matcher artifact: rules grouped by literal host (sorted, with CSR-style
+    `host_offsets`) and sorted by literal path prefix within each host.
+    Duplicate rules keep the first vendor/type seen, in vendor id order, and
+    the max of each metric. With `presorted`, entries are streamed as given
+    and must already be (stably) sorted by vendor id.
+    """
+    if not presorted:
+        entries = sorted(entries, key=lambda e: e[0])
+    rules = {}
+    for vendor_id, (rule, rtype, cookies, fingerprinting, prevalence, sites) in entries:
+        existing = rules.get(rule)
+        if existing is None:
+            rules[rule] = [vendor_id, rtype, cookies, fingerprinting, prevalence, sites]
+        else:
+            for col, value in zip((2, 3, 4, 5), (cookies, fingerprinting, prevalence, sites)):
+                if value > existing[col]:
+                    existing[col] = value
+
+    vendor_ids = sorted({r[0] for r in rules.values()})
+    vendor_idx = {vid: i for i, vid in enumerate(vendor_ids)}
+
+    by_host = {}
+    for rule, (vendor_id, rtype, cookies, fingerprinting, prevalence, sites) in rules.items():
+        host, path_prefix = split_rule_prefix(rule)
+        by_host.setdefault(host, []).append(
+            [path_prefix, rule, vendor_idx[vendor_id], rtype, cookies, fingerprinting, prevalence, sites])
+
+    hosts = sorted(by_host)
+    host_offsets = [0]
+    rows = []
+    for host in hosts:
+        rows.extend(sorted(by_host[host], key=lambda r: (r[0], r[1])))
+        host_offsets.append(len(rows))
+
+    return {
+        'version': 1,
+        'source': 'duckduckgo-tracker-radar',
+        'vendors': vendor_ids,
+        'hosts': hosts,
+        'host_offsets': host_offsets,
+        'columns': RESOURCE_RULE_COLUMNS,
+        'rules': rows,
+    }
+
+
+class ResourceMatcher:
+    """
+    Classify request URLs against a compiled resource-rule artifact.
+    Only rules indexed under one of the URL's parent hosts (plus the
+    catch-all group) whose literal path prefix matches are regex-tested.
+    """
+
+    def __init__(self, db: Dict):
+        self.db = db
+        self._groups = {}
+        self._compiled = {}
+
+    def _group(self, host: str) -> Optional[Tuple[List[int], Dict[str, List[int]]]]:
+        if host not in self._groups:
+            hosts = self.db['hosts']
+            pos = bisect.bisect_left(hosts, host)
+            group = None
+            if pos < len(hosts) and hosts[pos] == host:
+                start, end = self.db['host_offsets'][pos], self.db['host_offsets'][pos + 1]
+                by_prefix = {}
+                for i in range(start, end):
+                    by_prefix.setdefault(self.db['rules'][i][0], []).append(i)
+                group = (sorted({len(p) for p in by_prefix}, reverse=True), by_prefix)
+            self._groups[host] = group
+        return self._groups[host]
+
+    def _matches(self, i: int, url: str) -> bool:
+        pattern = self._compiled.get(i)
+        if pattern is None:
+            pattern = self._compiled[i] = re.compile(self.db['rules'][i][1])
+        return pattern.search(url) is not None
+
+    def classify(self, url: str) -> Optional[Dict]:
+        """
+        Return the matching rule (most specific host, then longest literal
+        prefix) as a dict, or None if the URL is not a known tracking resource.
+        """
+        rest = url.split('://', 1)[-1]
+        host, _, path = rest.partition('/')
+        host = host.split(':')[0].lower()
+        path = '/' + path
+        labels = host.split('.')
+
+        for candidate in ['.'.join(labels[i:]) for i in range(len(labels))] + ['']:
+            group = self._group(candidate)
+            if group is None:
+                continue
+            lengths, by_prefix = group
+            for length in lengths:
+                for i in by_prefix.get(path[:length], ()) if length <= len(path) else ():
+                    if self._matches(i, url):
+                        row = dict(zip(self.db['columns'], self.db['rules'][i]))
+                        row['vendor'] = self.db['vendors'][row['vendor']]
+                        return row
+        return None
+
+
+def build_initiator_graph(edges: Iterable[Tuple[str, str]], presorted: bool = False) -> Dict:
+    """
+    Compile (loader, loaded) domain edges into a CSR adjacency artifact:
+    sorted `domains` (ids are positions), and for domain i its loaded
+    domains are targets[offsets[i]:offsets[i + 1]], sorted.
+    With `presorted`, edges are streamed once as given and must already be
+    sorted and distinct.
+    """
+    if not presorted:
+        edges = sorted(set(edges))
+    # One pass: edge counts per loader (edges come grouped by loader) and the
+    # loaded domains, mapped to domain ids once every domain is known
+    runs, loaded_domains = [], []
+    for loader, loaded in edges:
+        if runs and runs[-1][0] == loader:
+            runs[-1][1] += 1
+        else:
+            runs.append([loader, 1])
+        loaded_domains.append(loaded)
+    domains = sorted({loader for loader, _ in runs}.union(loaded_domains))
+    domain_idx = {d: i for i, d in enumerate(domains)}
+
+    offsets = [0] * (len(domains) + 1)
+    for loader, count in runs:
+        offsets[domain_idx[loader] + 1] = count
+    for i in range(len(domains)):
+        offsets[i + 1] += offsets[i]
+    targets = [domain_idx[d] for d in loaded_domains]
+
+    return {
+        'version': 1,
+        'source': 'duckduckgo-tracker-radar',
+        'domains': domains,
+        'offsets': offsets,
+        'targets': targets,
+    }
+
+
+class InitiatorGraph:
+    """Query API over a compiled loader → loaded initiator graph."""
+
+    def __init__(self, db: Dict):
+        self.domains = db['domains']
+        self.offsets = db['offsets']
+        self.targets = db['targets']
+
+    def domain_id(self, domain: str) -> Optional[int]:
+        pos = bisect.bisect_left(self.domains, domain)
+        if pos < len(self.domains) and self.domains[pos] == domain:
+            return pos
+        return None
+
+    def loaders(self, domain: str) -> List[str]:
+        """Domains that directly load `domain`."""
+        i = self.domain_id(domain)
+        if i is None:
+            return []
+        found = []
+        for loader in range(len(self.domains)):
+            start, end = self.offsets[loader], self.offsets[loader + 1]
+            pos = bisect.bisect_left(self.targets, i, start, end)
+            if pos < end and self.targets[pos] == i:
+                found.append(self.domains[loader])
+        return found
+
+    def loaded_by(self, domain: str) -> List[str]:
+        """Domains directly loaded by `domain`."""
+        i = self.domain_id(domain)
+        if i is None:
+            return []
+        return [self.domains[t] for t in self.targets[self.offsets[i]:self.offsets[i + 1]]]
+
+    def transitively_loaded(self, domain: str, max_depth: Optional[int] = None) -> List[str]:
+        """Everything reachable once `domain` is present (breadth-first, sorted)."""
+        start = self.domain_id(domain)
+        if start is None:
+            return []
+        seen = {start}
+        frontier = [start]
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            next_frontier = []
+            for i in frontier:
+                for t in self.targets[self.offsets[i]:self.offsets[i + 1]]:
+                    if t not in seen:
+                        seen.add(t)
+                        next_frontier.append(t)
+            frontier = next_frontier
+            depth += 1
+        seen.discard(start)
+        return sorted(self.domains[i] for i in seen)
+
+
+def load_artifact(name: str) -> Optional[Dict]:
+    """Load data/<name>-duckduckgo.json, or None (with a message) if it hasn't been built."""
+    path = DATA_DIR / f'{name}-duckduckgo.json'
+    if not path.exists():
+        print(f"❌ {path} not found, run import-duckduckgo.py first")
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+# Artifacts with a vendor id table
+VENDOR_ARTIFACTS = ['cname-index', 'resource-rules']
+
+
+def remap_vendor_ids(artifact: Dict, id_map: Dict[str, Optional[str]]):
+    """
+    Point an artifact's vendor table at merged vendor ids (input id → output
+    id, None if dropped; ids not in `id_map` are kept). The importer's ids
+    are kept in `source_vendors`, so the next merge remaps from them again.
+    """
+    source_ids = artifact.setdefault('source_vendors', artifact['vendors'])
+    artifact['vendors'] = [id_map.get(vid, vid) for vid in source_ids]
+
+
+def remap_saved_artifacts(id_map: Dict[str, Optional[str]], data_dir: Path = DATA_DIR) -> List[Path]:
+    """remap_vendor_ids() on the artifacts saved in `data_dir`; returns the files rewritten."""
+    remapped = []
+    for name in VENDOR_ARTIFACTS:
+        path = data_dir / f'{name}-duckduckgo.json'
+        if not path.exists():
+            continue
+        with open(path) as f:
+            artifact = json.load(f)
+        remap_vendor_ids(artifact, id_map)
+        with open(path, 'w') as f:
+            json.dump(artifact, f, separators=(',', ':'))
+        remapped.append(path)
+    return remapped
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the Tracker Radar side artifacts built by import-duckduckgo.py.')
+    query = parser.add_mutually_exclusive_group(required=True)
+    query.add_argument('--cname-target', metavar='HOST',
+                       help='vendor a CNAME target (or any parent domain of it) belongs to')
+    query.add_argument('--match-url', metavar='URL',
+                       help='tracking resource rule matching a request URL')
+    query.add_argument('--who-loads', metavar='DOMAIN',
+                       help='domains seen loading DOMAIN')
+    query.add_argument('--loads', metavar='DOMAIN',
+                       help='domains loaded once DOMAIN is present (see --depth)')
+    parser.add_argument('--depth', type=int, default=1, metavar='N',
+                        help='hops to follow for --loads (default: 1, 0 = all)')
+    args = parser.parse_args()
+
+    if args.cname_target:
+        index = load_artifact('cname-index')
+        if index is not None:
+            vendor = lookup_cname_target(index, args.cname_target)
+            print(f"🔗 {args.cname_target}: " + (vendor if vendor else "not a known CNAME target"))
+    elif args.match_url:
+        db = load_artifact('resource-rules')
+        if db is not None:
+            row = ResourceMatcher(db).classify(args.match_url)
+            if row is None:
+                print(f"🔍 {args.match_url}: no matching resource rule")
+            else:
+                print(f"🔍 {args.match_url}: {row['vendor']} ({row['type'] or 'unknown type'})")
+                print(f"   rule {row['rule']}, prevalence {row['prevalence']}, sites {row['sites']}, "
+                      f"cookies {row['cookies']}, fingerprinting {row['fingerprinting']}")
+    else:
+        db = load_artifact('initiator-graph')
+        if db is not None:
+            graph = InitiatorGraph(db)
+            if args.who_loads:
+                domains = graph.loaders(args.who_loads)
+                print(f"🕸️  {len(domains)} domains load {args.who_loads}")
+            elif args.depth == 1:
+                domains = graph.loaded_by(args.loads)
+                print(f"🕸️  {args.loads} loads {len(domains)} domains")
+            else:
+                domains = graph.transitively_loaded(args.loads, args.depth or None)
+                print(f"🕸️  {args.loads} loads {len(domains)} domains within "
+                      + (f"{args.depth} hops" if args.depth else "any number of hops"))
+            for domain in domains:
+                print(f"   {domain}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Multi-category bitmask shared by the importers and the merge.
+
+Besides its primary `category`, every vendor carries `category_mask`: bit i
+is set for each ETALON category the sources put it in (CATEGORIES[i]), so
+"advertising AND security" is a single AND over the mask column.
+
+Run directly to query the merged vendors.json, e.g.
+    python scripts/vendor_categories.py advertising security
+"""
+
+import argparse
+import json
+from array import array
+from pathlib import Path
+from typing import Iterable, List
+
+# ETALON VendorCategory values in bit order. Append only: the masks in
+# already-written vendor files depend on these positions.
+CATEGORIES = [
+    'analytics', 'advertising', 'social', 'cdn', 'payments', 'chat',
+    'heatmaps', 'ab_testing', 'error_tracking', 'tag_manager', 'consent',
+    'video', 'fonts', 'security', 'push', 'forms', 'referral', 'booking',
+    'maps', 'web3', 'b2b_intelligence', 'email_marketing', 'other',
+]
+
+CATEGORY_BITS = {category: 1 << i for i, category in enumerate(CATEGORIES)}
+
+
+def category_mask(categories: Iterable[str]) -> int:
+    """Bitmask of `categories` (unknown ones count as 'other')."""
+    mask = 0
+    for category in categories:
+        mask |= CATEGORY_BITS.get(category, CATEGORY_BITS['other'])
+    return mask
+
+
+def mask_categories(mask: int) -> List[str]:
+    """The categories set in `mask`, in bit order."""
+    return [category for category, bit in CATEGORY_BITS.items() if mask & bit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find merged vendors by category.')
+    parser.add_argument('categories', nargs='+', choices=CATEGORIES, metavar='CATEGORY',
+                        help=f"one of: {', '.join(CATEGORIES)}")
+    parser.add_argument('--any', action='store_true',
+                        help='match vendors in any of the categories (default: all of them)')
+    parser.add_argument('--vendors', type=Path,
+                        default=Path(__file__).parent.parent / 'data' / 'vendors.json',
+                        help='vendor database to query (default: data/vendors.json)')
+    args = parser.parse_args()
+
+    with open(args.vendors) as f:
+        vendors = json.load(f)['vendors']
+    masks = array('L', (v.get('category_mask', CATEGORY_BITS.get(v.get('category'), 0)) for v in vendors))
+
+    wanted = category_mask(args.categories)
+    if args.any:
+        matches = [i for i, mask in enumerate(masks) if mask & wanted]
+    else:
+        matches = [i for i, mask in enumerate(masks) if mask & wanted == wanted]
+
+    print(f"🏷️  {len(matches)} of {len(vendors)} vendors in {(' or ' if args.any else ' and ').join(args.categories)}")
+    for i in matches:
+        v = vendors[i]
+        print(f"   {v['id']}: {', '.join(mask_categories(masks[i]))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+JSON Lines handoff between the importers and merge-all-vendors.py.
+
+Importers append one vendor per line as they go; the merge reads the file
+back as a stream. Lines are written to '<name>.jsonl.partial' (inspectable
+while an import is still running) and renamed into place once complete.
+Plain .json vendor files can be written (VendorArrayWriter) and read back
+(iter_vendor_file) a vendor at a time as well.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, TextIO
+
+# Characters read per refill by iter_vendor_file()
+READ_CHUNK = 1 << 16
+
+
+def jsonl_path(path: Path) -> Path:
+    """The JSON Lines sibling of a vendors-*.json file."""
+    return Path(path).with_suffix('.jsonl')
+
+
+def newest_vendor_file(path: Path) -> Path:
+    """
+    `path` or its .jsonl sibling, whichever was written last, so a merge
+    always picks up the latest import whatever format it was saved in.
+    """
+    path = Path(path)
+    lines_path = jsonl_path(path)
+    if not lines_path.exists():
+        return path
+    if not path.exists() or lines_path.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+        return lines_path
+    return path
+
+
+def iter_jsonl(path: Path) -> Iterator[Dict]:
+    """Stream vendors from a JSON Lines file, one record in memory at a time."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class _JsonStream:
+    """Reads a JSON text a token or a whole value at a time, through a small buffer."""
+
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.decoder = json.JSONDecoder()
+        self.buffer, self.pos, self.eof = '', 0, False
+
+    def _fill(self) -> bool:
+        """Read the next chunk, dropping what was consumed; False at end of file."""
+        chunk = '' if self.eof else self.f.read(READ_CHUNK)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+        return bool(chunk)
+
+    def peek(self) -> str:
+        """The next non-whitespace character ('' at end of file)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of `chars`."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"expected one of {chars!r} in {self.f.name}, got {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next whole value, reading more until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number running into the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def iter_vendor_file(path: Path) -> Iterator[Dict]:
+    """
+    Stream vendors from a .json vendor file, either a plain array or a
+    VendorDatabase object's "vendors" array, one record in memory at a time.
+    Reading stops at the end of the array.
+    """
+    with open(path) as f:
+        stream = _JsonStream(f)
+        if stream.expect('[{') == '{':
+            while stream.peek() != '}':
+                key = stream.value()
+                stream.expect(':')
+                if key == 'vendors':
+                    stream.expect('[')
+                    break
+                stream.value()
+                if stream.expect(',}') == '}':
+                    return
+            else:
+                return
+        if stream.peek() == ']':
+            return
+        while True:
+            yield stream.value()
+            if stream.expect(',]') == ']':
+                return
+
+
+class VendorWriter:
+    """Append vendors to a JSON Lines file, flushing every line."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.partial_path = self.path.with_name(self.path.name + '.partial')
+        self.file = open(self.partial_path, 'w')
+        self.count = 0
+
+    def write(self, vendor: Dict):
+        self.file.write(json.dumps(vendor, separators=(',', ':')) + '\n')
+        self.file.flush()
+        self.count += 1
+
+    def extend(self, vendors: Iterable[Dict]):
+        for vendor in vendors:
+            self.write(vendor)
+
+    def close(self):
+        """Finish the file and move it into place."""
+        self.file.close()
+        os.replace(self.partial_path, self.path)
+
+    def discard(self):
+        """Drop the partial file of a failed import."""
+        self.file.close()
+        self.partial_path.unlink()
+
+
+class VendorArrayWriter(VendorWriter):
+    """
+    Write vendors to a .json file exactly as json.dump(vendors, f, indent=2)
+    would, a vendor at a time, moved into place on close.
+    """
+
+    def write(self, vendor: Dict):
+        self.file.write((',' if self.count else '[') + '\n  ' + json.dumps(vendor, indent=2).replace('\n', '\n  '))
+        self.count += 1
+
+    def close(self):
+        self.file.write('\n]' if self.count else '[]')
+        super().close()